@@ -0,0 +1,269 @@
+import argparse
+import copy
+import csv
+import functools
+import os
+import runpy
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import instrument
+from scheduler import Schedule
+
+# Bar colours handed out to categories in order of first appearance
+palette = ["#B0E0E6", "#90EE90", "#DDA0DD", "#FFA500", "#ADD8E6", "#FFD700",
+           "#FFB6C1", "#C4D79B", "#B7DEE8", "#E6B8B7", "#B4C6E7", "#F4B084"]
+
+columns = ["Field", "Region", "Task", "Category", "Start", "Duration", "Delay", "End", "Total Float", "Critical"]
+# Added when the plan follows a working calendar
+date_columns = ["Start Date", "End Date"]
+
+# Fields handed to a worker at a time in combined mode
+chunk_size = 200
+# Scheduled chunks per worker that may wait for the writer in combined mode
+chunks_ahead = 2
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+templates_help = "combined, seed, field-preprep, or a planning workbook path"
+
+
+# Workflow templates a field can be planned from: a built-in workflow or a
+# planning workbook (.xlsx/.xlsm, read through the workbook cache)
+def build_template(name):
+    if name.lower().endswith((".xlsx", ".xlsm")):
+        from workbook_loader import load_schedule
+        return load_schedule(name)
+    if name == "combined":
+        from workflows import combined_task_buckets
+        return Schedule.from_buckets(combined_task_buckets, numeric_end=True)
+    if name == "seed":
+        from workflows import task_buckets
+        return Schedule.from_buckets(task_buckets)
+    if name == "field-preprep":
+        return Schedule.from_rows(runpy.run_path(os.path.join(here, "Field-preprep.py"))["tasks"])
+    raise ValueError(f"Unknown workflow template: {name!r}")
+
+
+def template_stem(template):
+    return os.path.splitext(os.path.basename(template))[0]
+
+
+# Each template is built once per process, since a pool worker plans many
+# fields from the same one, and every field gets its own copy
+@functools.lru_cache(maxsize=None)
+def cached_template(name):
+    return build_template(name)
+
+
+# "Task A=2; Task B=1.5" -> {"Task A": 2.0, "Task B": 1.5}
+def parse_task_values(text):
+    values = {}
+    for item in (text or "").split(";"):
+        if item.strip():
+            name, _, days = item.partition("=")
+            values[name.strip()] = float(days)
+    return values
+
+
+# Field table: field_id, region, start_offset, durations, delays and an
+# optional start_date, which overrides start_offset under a working calendar
+def read_fields(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            {
+                "field_id": row["field_id"],
+                "region": row.get("region") or "default",
+                "start_offset": float(row.get("start_offset") or 0),
+                "durations": parse_task_values(row.get("durations")),
+                "delays": parse_task_values(row.get("delays")),
+                "start_date": row.get("start_date") or None,
+            }
+            for row in csv.DictReader(f)
+        ]
+
+
+# The template's Schedule with one field's offset, durations and delays applied
+def plan_field(template, field):
+    schedule = copy.deepcopy(cached_template(template))
+    for column in ("durations", "delays"):
+        for name in field[column]:
+            if name not in schedule.index:
+                raise ValueError(f"Unknown task in the {column} of field {field['field_id']!r}: {name!r}")
+    schedule.shift(field["start_offset"])
+    for name, days in field["durations"].items():
+        schedule.set_duration(name, days)
+    schedule.apply_delays(field["delays"])
+    return schedule
+
+
+# The field with a start_date turned into a working-day start_offset, and
+# its region calendar (None without calendars)
+def calendar_field(field, calendars):
+    if not calendars:
+        return field, None
+    from work_calendar import parse_date, region_calendar
+
+    calendar = region_calendar(field["region"], *calendars)
+    if field.get("start_date"):
+        day = calendar.day_of(parse_date(field["start_date"]))
+        field = dict(field, start_offset=float(calendar.working_offset(day)))
+    return field, calendar
+
+
+# Table rows for one field. `calendars` is (season start, closures CSV or
+# None): offsets then count working days of the field's region calendar and
+# each row gains its first and last calendar date.
+def schedule_field(template, field, calendars=None):
+    from gantt_excel import float_cells
+
+    field, calendar = calendar_field(field, calendars)
+    schedule = plan_field(template, field)
+    rows = [
+        (field["field_id"], field["region"], name, category, start, duration, delay, end) + flags
+        for (name, category, start, end), duration, delay, flags in zip(
+            schedule.tasks(), schedule.duration.tolist(), schedule.delay.tolist(), float_cells(schedule))
+    ]
+    if calendar is None:
+        return rows
+    first, last = calendar.span_dates(schedule.start, schedule.end)
+    return [row + dates for row, dates in zip(rows, zip(np.datetime_as_string(first).tolist(),
+                                                        np.datetime_as_string(last).tolist()))]
+
+
+def schedule_fields(template, fields, calendars=None):
+    rows = []
+    for field in fields:
+        rows.extend(schedule_field(template, field, calendars))
+    return rows
+
+
+# Start, end and category of each row schedule_fields would give, without
+# building the rows or their float analysis
+def schedule_spans(template, fields, calendars=None):
+    starts, ends, categories = [], [], []
+    for field in fields:
+        schedule = plan_field(template, calendar_field(field, calendars)[0])
+        starts.append(schedule.start)
+        ends.append(schedule.start + schedule.duration)
+        categories.extend(schedule.categories)
+    return np.concatenate([np.empty(0)] + starts), np.concatenate([np.empty(0)] + ends), categories
+
+
+# Adaptive timeline resolution, with active-task counts per cell under the table.
+# constant_memory flushes each row to disk once the next one starts, which is
+# why the exporter writes rows strictly in order. With spans (see add_sheet)
+# rows can be an iterator, so the table itself is never held in memory. What
+# still grows with the table is the spans and xlsxwriter's record of every
+# merged bar cell.
+def write_rows(path, rows, dated=False, spans=None):
+    from gantt_excel import write_gantt_workbook
+
+    categories = {}
+    for category in (row[3] for row in rows) if spans is None else spans[2]:
+        categories.setdefault(category, palette[len(categories) % len(palette)])
+    return write_gantt_workbook(
+        path, "Gantt", columns + date_columns if dated else columns, rows, categories,
+        options={"constant_memory": True},
+        column_widths=[("A:B", 12), ("C:C", 35), ("D:D", 18), ("I:L" if dated else "I:J", 12)],
+        timeline_width=6, load_rows=True, spans=spans,
+    )
+
+
+def write_region(template, region, fields, out_dir, calendars=None):
+    path = os.path.join(out_dir, f"{region}.xlsx")
+    return write_rows(path, schedule_fields(template, fields, calendars), calendars is not None)
+
+
+# One workbook per region, each scheduled and written by its own worker
+def run_sharded(fields, template, out_dir, workers=None, calendars=None):
+    os.makedirs(out_dir, exist_ok=True)
+    regions = {}
+    for field in fields:
+        regions.setdefault(field["region"], []).append(field)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(write_region, template, region, group, out_dir, calendars)
+                for region, group in regions.items()]
+        return [job.result() for job in jobs]
+
+
+# func(template, chunk, calendars) for each chunk in order, with at most
+# `ahead` chunks submitted beyond the one being consumed
+def ordered_results(pool, func, template, chunks, calendars, ahead):
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(func, template, chunk, calendars))
+        if len(pending) > ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# Schedule in parallel, then stream every field into a single workbook. A
+# first, cheaper pass plans the fields for each row's span alone, which fixes
+# the timeline and the load rows; the second builds the rows chunk by chunk
+# and writes them as they arrive, so the parent never holds the whole table.
+def run_combined(fields, template, path, workers=None, calendars=None):
+    chunks = [fields[i:i + chunk_size] for i in range(0, len(fields), chunk_size)]
+    ahead = chunks_ahead * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(ordered_results(pool, schedule_spans, template, chunks, calendars, ahead))
+        spans = (np.concatenate([np.empty(0)] + [starts for starts, _, _ in parts]),
+                 np.concatenate([np.empty(0)] + [ends for _, ends, _ in parts]),
+                 [category for _, _, categories in parts for category in categories])
+        del parts
+        rows = (row for chunk_rows in ordered_results(pool, schedule_fields, template, chunks, calendars, ahead)
+                for row in chunk_rows)
+        return [write_rows(path, rows, calendars is not None, spans)]
+
+
+# (season start, closures CSV) when the plan should follow a working calendar
+def calendar_spec(args):
+    if args.calendar and not args.season_start:
+        raise SystemExit("--calendar needs --season-start")
+    return (args.season_start, args.calendar) if args.season_start else None
+
+
+def add_calendar_arguments(parser):
+    parser.add_argument("--season-start", help="date of working day 0 (YYYY-MM-DD); adds calendar dates")
+    parser.add_argument("--calendar", help="CSV of non-working days per region (needs --season-start)")
+    parser.add_argument("--region", default="default", help="calendar region for a template-only plan")
+
+
+# Export arguments, shared with `gantt_cli.py export`
+def add_arguments(parser):
+    parser.add_argument("fields", nargs="?", help="CSV with field_id, region, start_offset, durations, delays; "
+                                                  "without it the template itself is exported")
+    parser.add_argument("--template", default="combined", help=templates_help)
+    parser.add_argument("--out", help="workbook path, or output directory for per-region workbooks")
+    parser.add_argument("--combined", action="store_true", help="write one workbook instead of one per region")
+    parser.add_argument("--workers", type=int, default=None)
+    add_calendar_arguments(parser)
+
+
+def run(args):
+    calendars = calendar_spec(args)
+    if not args.fields:
+        path = args.out or f"{template_stem(args.template)}.xlsx"
+        field = {"field_id": template_stem(args.template), "region": args.region, "start_offset": 0,
+                 "durations": {}, "delays": {}}
+        write_rows(path, schedule_field(args.template, field, calendars), calendars is not None)
+        print(f"✅ File saved to: {path}")
+        return
+    fields = read_fields(args.fields)
+    if args.combined:
+        paths = run_combined(fields, args.template, args.out or "gantt_batch.xlsx", args.workers, calendars)
+    else:
+        paths = run_sharded(fields, args.template, args.out or "gantt_batch", args.workers, calendars)
+    print(f"✅ Scheduled {len(fields)} fields into {len(paths)} workbook(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Schedule and export Gantt workbooks for many fields")
+    add_arguments(parser)
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+    run(args)
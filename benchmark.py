@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import platform
+import random
+import runpy
+import statistics
+import sys
+import tempfile
+import time
+
+from scheduler import Schedule
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+# Synthetic plan shapes: fan-out is the number of dependencies per task and
+# window is how far back they may reach (small windows give deep chains)
+shapes = {
+    "chain": {"fanout": 1, "window": 1},
+    "narrow": {"fanout": 2, "window": 8},
+    "wide": {"fanout": 3, "window": 500},
+}
+
+
+# A combined_task_buckets-shaped plan: categories of (name, dependency, duration)
+# where the dependency is a start day, a task name or a list of names
+def synthetic_buckets(size, fanout=2, window=8, categories=20, roots=0.01, seed=0):
+    rng = random.Random(seed)
+    per_category = max(1, size // categories)
+    buckets = {}
+    for i in range(size):
+        category = f"Category {min(i // per_category, categories - 1)}"
+        duration = rng.choice((0.5, 1, 1, 2, 3))
+        if i == 0 or rng.random() < roots:
+            entry = (f"T{i}", rng.randrange(5), duration)
+        else:
+            picks = {rng.randrange(max(0, i - window), i) for _ in range(fanout)}
+            deps = [f"T{d}" for d in sorted(picks)]
+            entry = (f"T{i}", deps[0] if len(deps) == 1 else deps, duration)
+        buckets.setdefault(category, []).append(entry)
+    return buckets
+
+
+# Seconds per run, one sample per repeat
+def timed(func, repeat=1, per=1):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) / per)
+    return samples
+
+
+def bench_schedule(size, shape, repeat):
+    buckets = synthetic_buckets(size, **shapes[shape])
+    results = {"resolve": timed(lambda: Schedule.from_buckets(buckets), repeat)}
+    schedule = Schedule.from_buckets(buckets)
+    rng = random.Random(1)
+    names = [rng.choice(schedule.names) for _ in range(100)]
+    results["delay_propagation"] = timed(
+        lambda: [schedule.set_delay(name, rng.choice((0, 1, 2))) for name in names], repeat, len(names))
+    results["critical_path"] = timed(schedule.analyze, repeat)
+    return results
+
+
+def bench_render(size, shape, repeat):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from gantt_chart import GanttChart
+
+    schedule = Schedule.from_buckets(synthetic_buckets(size, **shapes[shape]))
+    chart = GanttChart("Benchmark", "Day", {})
+    canvas = FigureCanvasAgg(chart.figure)
+    chart.attach(canvas)
+    tasks = schedule.tasks()
+
+    def render():
+        chart.draw(tasks)
+        canvas.draw()
+
+    results = {"render_full": timed(render, repeat)}
+    names = schedule.names[:: max(1, size // 10)]
+
+    def update():
+        for name in names:
+            schedule.set_delay(name, 1 - schedule.delay[schedule.index[name]])
+            chart.update(schedule.tasks())
+
+    results["render_update"] = timed(update, repeat, len(names))
+    return results
+
+
+# The real exporters on their own task tables; these do not depend on the
+# synthetic shape or size, so they are timed once per run
+def bench_fixed_exports(repeat):
+    from gantt_excel import write_gantt_workbook
+
+    results = {}
+    with tempfile.TemporaryDirectory() as out:
+        for script in ("Field-preprep.py", "soil_testing.py"):
+            module = runpy.run_path(os.path.join(here, script))
+            path = os.path.join(out, script.replace(".py", ".xlsx"))
+            rows = module["table_rows"]()
+            results[f"export_{script[:-3]}"] = timed(lambda: write_gantt_workbook(
+                path, "Gantt", module["columns"], rows, module["category_colors"]), repeat)
+    return results
+
+
+# The exporter on a synthetic table
+def bench_export(size, shape, repeat):
+    from gantt_excel import write_gantt_workbook
+
+    results = {}
+    with tempfile.TemporaryDirectory() as out:
+        schedule = Schedule.from_buckets(synthetic_buckets(size, **shapes[shape]))
+        columns = ["Task", "Category", "Start", "Duration"]
+        rows = [(name, category, start, end - start) for name, category, start, end in schedule.tasks()]
+        path = os.path.join(out, "synthetic.xlsx")
+        results["export_synthetic"] = timed(lambda: write_gantt_workbook(
+            path, "Gantt", columns, rows, {}, options={"constant_memory": True}), repeat)
+    return results
+
+
+# One result per stage: the best of the repeats ("seconds") and their median
+def run(sizes, shape_names, repeat, render_max, export_max):
+    results = []
+
+    def add(stages, shape, size):
+        for stage, samples in stages.items():
+            seconds, median = min(samples), statistics.median(samples)
+            results.append({"stage": stage, "shape": shape, "size": size, "seconds": seconds, "median": median})
+            print(f"{stage:<28} {shape:<7} {size:>9}  {seconds * 1000:10.2f} ms  (median {median * 1000:.2f})",
+                  flush=True)
+
+    if any(size <= export_max for size in sizes):
+        add(bench_fixed_exports(repeat), "-", 0)
+    for shape in shape_names:
+        for size in sizes:
+            stages = bench_schedule(size, shape, repeat)
+            if size <= render_max:
+                stages.update(bench_render(size, shape, repeat))
+            if size <= export_max:
+                stages.update(bench_export(size, shape, repeat))
+            add(stages, shape, size)
+    return results
+
+
+# Stages whose best and median time are both slower than the baseline's by
+# more than the tolerance; one noisy repeat alone does not count. Baselines
+# without medians are compared on the best time only.
+def compare(results, baseline, tolerance):
+    previous = {(r["stage"], r["shape"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        before = previous.get((r["stage"], r["shape"], r["size"]))
+        if not before or not before["seconds"]:
+            continue
+        slower = r["seconds"] > before["seconds"] * (1 + tolerance)
+        if slower and before.get("median") and r.get("median") is not None:
+            slower = r["median"] > before["median"] * (1 + tolerance)
+        if slower:
+            regressions.append((r, before["seconds"]))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark scheduling, delay propagation, rendering and export")
+    parser.add_argument("--sizes", default="100,1000,10000,100000",
+                        help="comma-separated task counts, e.g. 100,1000,1000000")
+    parser.add_argument("--shapes", default=",".join(shapes), help="comma-separated: " + ", ".join(shapes))
+    parser.add_argument("--repeat", type=int, default=5, help="runs per stage; the best and median are kept")
+    parser.add_argument("--render-max", type=int, default=2000, help="largest plan to render")
+    parser.add_argument("--export-max", type=int, default=100000, help="largest plan to export")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = run(sizes, args.shapes.split(","), args.repeat, args.render_max, args.export_max)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"python": sys.version.split()[0], "machine": platform.machine(), "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r, before in regressions:
+            print(f"REGRESSION {r['stage']} {r['shape']} {r['size']}: "
+                  f"{before * 1000:.2f} ms -> {r['seconds'] * 1000:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
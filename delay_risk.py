@@ -0,0 +1,202 @@
+import os
+import runpy
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from instrument import span
+from scheduler import Schedule
+
+# Delay model per "Possible Delay Cause": (probability, distribution, params)
+# triangular -> (low, mode, high) days, uniform -> (low, high), exponential -> (mean,)
+cause_models = {
+    "None": (0.0, "fixed", (0,)),
+    "Farmer log delay": (0.15, "triangular", (0.5, 0.5, 2)),
+    "Record not updated": (0.10, "triangular", (0.5, 0.5, 1.5)),
+    "Manual entry mistake": (0.10, "uniform", (0.25, 0.5)),
+    "Field inaccessible": (0.20, "triangular", (0.5, 1, 3)),
+    "Lab backlog": (0.30, "triangular", (1, 2, 5)),
+    "Heavy rain": (0.25, "exponential", (2,)),
+    "Staff unavailability": (0.15, "triangular", (0.5, 1, 2)),
+    "Sample collection delay": (0.15, "triangular", (0.5, 1, 2)),
+    "Tag mismatch": (0.05, "uniform", (0.25, 0.5)),
+    "Dryer malfunction": (0.10, "triangular", (0.5, 1, 3)),
+    "Sieve unavailable": (0.05, "uniform", (0.5, 1)),
+    "Bag shortage": (0.05, "uniform", (0.25, 1)),
+    "Reagent unavailability": (0.10, "triangular", (1, 2, 4)),
+    "pH meter calibration": (0.10, "uniform", (0.25, 0.5)),
+    "Glassware shortage": (0.05, "uniform", (0.5, 1)),
+    "Instrument drift": (0.10, "uniform", (0.5, 1)),
+    "Reagent delay": (0.10, "triangular", (1, 2, 4)),
+    "Burette unavailable": (0.05, "uniform", (0.25, 0.5)),
+    "Format error": (0.05, "uniform", (0.25, 0.5)),
+    "Supervisor unavailable": (0.15, "triangular", (0.5, 1, 2)),
+    "Farmer unavailable": (0.20, "triangular", (0.5, 1, 3)),
+    "Transport delay": (0.20, "triangular", (0.5, 1, 3)),
+    "Labor shortage": (0.25, "triangular", (1, 2, 4)),
+    "Water scarcity": (0.15, "triangular", (0.5, 1, 3)),
+    "Culture expired": (0.05, "triangular", (1, 2, 5)),
+    "Cover material delay": (0.10, "uniform", (0.5, 1.5)),
+    "Tool unavailability": (0.15, "uniform", (0.5, 1.5)),
+    "Rain interruption": (0.25, "exponential", (1.5,)),
+    "Low labor": (0.20, "triangular", (0.5, 1, 2)),
+    "Lab overload": (0.25, "triangular", (1, 2, 5)),
+    "Final approval delay": (0.10, "uniform", (0.5, 1.5)),
+    "Farmer indecision": (0.20, "triangular", (0.5, 1, 3)),
+    "List outdated": (0.10, "uniform", (0.5, 1)),
+    "Late response": (0.30, "triangular", (0.5, 1, 3)),
+    "Data error": (0.05, "uniform", (0.25, 0.5)),
+    "Payment delay": (0.15, "triangular", (0.5, 1, 3)),
+    "No response": (0.20, "triangular", (0.5, 1, 3)),
+    "Courier delay": (0.25, "triangular", (1, 2, 5)),
+    "Sample rejected": (0.10, "triangular", (2, 3, 7)),
+    "Store not ready": (0.10, "uniform", (0.5, 1.5)),
+}
+
+# Used for causes missing from cause_models
+default_cause_model = (0.10, "triangular", (0.5, 1, 2))
+
+# Largest end-day matrix (tasks x scenarios) a worker holds at once
+max_block_cells = 4_000_000
+
+
+# Flatten a resolved Schedule into picklable arrays for the workers. Tasks are
+# renumbered in topological order so every dependency index is lower than its task.
+def build_plan(schedule, task_causes, models=None):
+    models = cause_models if models is None else models
+    store = schedule.store
+    order = schedule.order
+    rank = np.empty(len(order), dtype=order.dtype)
+    rank[order] = np.arange(len(order), dtype=order.dtype)
+    base = np.nan_to_num(store.base_start)[order]
+    duration = store.duration[order]
+    ptr, dep_rank = store.dep_ptr.tolist(), rank[store.dep_index].tolist()
+    deps = [dep_rank[ptr[i]:ptr[i + 1]] for i in order.tolist()]
+
+    groups = {}
+    for pos, i in enumerate(order.tolist()):
+        cause = task_causes.get(store.names[i], "None")
+        probability, kind, params = models.get(cause, default_cause_model)
+        if probability <= 0:
+            continue
+        rows, probs, param_rows = groups.setdefault(kind, ([], [], []))
+        rows.append(pos)
+        probs.append(probability)
+        param_rows.append(params)
+    groups = {
+        kind: (np.array(rows), np.array(probs), np.array(params, dtype=float))
+        for kind, (rows, probs, params) in groups.items()
+    }
+    return base, duration, deps, groups
+
+
+def sample_delays(plan, scenarios, rng):
+    base, duration, deps, groups = plan
+    delays = np.zeros((len(base), scenarios))
+    for kind, (rows, probs, params) in groups.items():
+        shape = (len(rows), scenarios)
+        hit = rng.random(shape) < probs[:, None]
+        if kind == "triangular":
+            low, mode, high = (params[:, k:k + 1] for k in range(3))
+            amount = rng.triangular(low, mode, np.maximum(high, low + 1e-9), shape)
+        elif kind == "uniform":
+            amount = rng.uniform(params[:, :1], params[:, 1:2], shape)
+        elif kind == "exponential":
+            amount = rng.exponential(params[:, :1], shape)
+        elif kind == "fixed":
+            amount = np.broadcast_to(params[:, :1], shape)
+        else:
+            raise ValueError(f"Unknown delay distribution: {kind!r}")
+        delays[rows] = np.where(hit, amount, 0.0)
+    return delays
+
+
+# Propagate one block of scenarios; each column is one scenario. Returns the
+# makespans and how many scenarios each task sat on the critical path.
+def simulate_block(plan, scenarios, seed):
+    base, duration, deps, groups = plan
+    rng = np.random.default_rng(seed)
+    delays = sample_delays(plan, scenarios, rng)
+    n = len(base)
+    end = np.empty((n, scenarios))
+    binding = np.full((n, scenarios), -1, dtype=np.int32)
+    for i in range(n):
+        start = np.full(scenarios, base[i])
+        for d in deps[i]:
+            later = end[d] >= start
+            np.maximum(start, end[d], out=start)
+            binding[i][later] = d
+        end[i] = start + delays[i] + duration[i]
+
+    makespan = end.max(axis=0)
+    critical = np.zeros(n, dtype=np.int64)
+    columns = np.arange(scenarios)
+    current = end.argmax(axis=0)
+    active = np.ones(scenarios, dtype=bool)
+    while active.any():
+        critical += np.bincount(current[active], minlength=n)
+        previous = binding[current, columns]
+        active &= previous >= 0
+        current = np.where(active, previous, current)
+    return makespan, critical
+
+
+def _blocks(total, block):
+    while total > 0:
+        size = min(block, total)
+        yield size
+        total -= size
+
+
+# Run the Monte Carlo simulation. Blocks are spread across a process pool when
+# workers > 1; results are reproducible for a given seed and block layout.
+def simulate(schedule, task_causes, scenarios=10000, workers=None, seed=None, models=None,
+             percentiles=(50, 90)):
+    plan = build_plan(schedule, task_causes, models)
+    block = max(1, min(scenarios, max_block_cells // max(1, len(schedule))))
+    sizes = list(_blocks(scenarios, block))
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = workers or 1
+    with span("risk.simulate"):
+        if workers > 1 and len(sizes) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(simulate_block, [plan] * len(sizes), sizes, seeds))
+        else:
+            results = [simulate_block(plan, size, s) for size, s in zip(sizes, seeds)]
+
+    makespans = np.concatenate([r[0] for r in results])
+    critical = sum(r[1] for r in results)
+    names = [schedule.names[i] for i in schedule.order.tolist()]
+    return {
+        "scenarios": scenarios,
+        "planned_makespan": schedule.makespan,
+        "mean_makespan": float(makespans.mean()),
+        "percentiles": {p: float(v) for p, v in zip(percentiles, np.percentile(makespans, percentiles))},
+        "critical_frequency": dict(zip(names, (critical / scenarios).tolist())),
+    }
+
+
+# Load the master workflow from Field-preprep.py with its delay causes
+def field_preprep_plan(path=None):
+    path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), "Field-preprep.py")
+    rows = runpy.run_path(path)["tasks"]
+    return Schedule.from_rows(rows), {row[0]: row[4] for row in rows}
+
+
+def print_summary(result, causes, top=10):
+    print(f"Scenarios: {result['scenarios']}")
+    print(f"Planned makespan: {result['planned_makespan']:.1f} days")
+    for p, value in result["percentiles"].items():
+        print(f"P{p} makespan: {value:.1f} days")
+    print("Most frequent critical-path tasks:")
+    ranked = sorted(result["critical_frequency"].items(), key=lambda item: -item[1])
+    for name, freq in ranked[:top]:
+        print(f"  {name:<40} {freq:6.1%}  ({causes.get(name, 'None')})")
+
+
+if __name__ == "__main__":
+    scenarios = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    schedule, causes = field_preprep_plan()
+    print_summary(simulate(schedule, causes, scenarios, workers=workers), causes)
@@ -1,138 +1,120 @@
-import tkinter as tk
-from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-# Optimized task breakdown with reduced durations
-task_buckets = {
-    "Planning": [
-        ("Understand Crop Requirement", 0, 1),
-        ("Determine Sowing Window", 0, 1),
-        ("Identify Suitable Varieties", 0, 1),
-        ("Evaluate Crop Variety Suitability", "Identify Suitable Varieties", 1)
-    ],
-    "Vendor": [
-        ("Search for Certified Vendors", "Evaluate Crop Variety Suitability", 1),
-        ("Vendor Verification", "Search for Certified Vendors", 0.5),
-        ("Vendor Approval", "Vendor Verification", 0.5)
-    ],
-    "Costing": [
-        ("Check Seed Cost", "Vendor Approval", 0.5),
-        ("Assess Availability", "Vendor Approval", 0.5),
-        ("Finalize Procurement Decision", ["Check Seed Cost", "Assess Availability"], 0.5)
-    ],
-    "Procurement": [
-        ("Seed Procurement", "Finalize Procurement Decision", 1),
-        ("Seed Conditioning", "Seed Procurement", 0.5),
-        ("Storage Planning", "Seed Conditioning", 0.5)
-    ]
-}
-
-# Color coding for each category
-category_colors = {
-    "Planning": "skyblue",
-    "Vendor": "lightgreen",
-    "Costing": "violet",
-    "Procurement": "orange"
-}
-
-# Delay simulation based on selected decision
-def apply_decision_logic(decision, task_list):
-    delay_map = {}
-    if decision == "Vendor Delay":
-        delay_map["Vendor Verification"] = 2
-    elif decision == "Rain Delay":
-        delay_map["Seed Procurement"] = 2
-    elif decision == "Cost Issue":
-        delay_map["Check Seed Cost"] = 1
-
-    updated = []
-    for task in task_list:
-        name, category, start, end = task
-        delay = delay_map.get(name, 0)
-        updated.append((name, category, start + delay, end + delay))
-    return updated
-
-# Resolve tasks with support for multiple dependencies
-def resolve_task_schedule():
-    flat = []
-    task_end = {}
-
-    for category, tasks in task_buckets.items():
-        for task in tasks:
-            name = task[0]
-            dependency = task[1]
-            duration = task[2]
-
-            if isinstance(dependency, str):
-                start = task_end[dependency]
-            elif isinstance(dependency, (list, tuple)):
-                start = max(task_end[dep] for dep in dependency)
-            else:
-                start = dependency
-
-            end = start + duration
-            flat.append((name, category, start, end))
-            task_end[name] = end
-
-    return flat
-
-# GUI Class
-class GanttGUI(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Seed Procurement Gantt Tracker")
-        self.geometry("1200x850")
-        self.task_list = resolve_task_schedule()
-        self.build_ui()
-
-    def build_ui(self):
-        control_frame = tk.Frame(self)
-        control_frame.pack(pady=10)
-
-        tk.Label(control_frame, text="Simulate Delay Scenario:").grid(row=0, column=0, padx=10)
-        self.decision_var = tk.StringVar()
-        self.decision_combo = ttk.Combobox(control_frame, textvariable=self.decision_var)
-        self.decision_combo['values'] = ["None", "Vendor Delay", "Rain Delay", "Cost Issue"]
-        self.decision_combo.set("None")
-        self.decision_combo.grid(row=0, column=1, padx=10)
-
-        ttk.Button(control_frame, text="Update Gantt", command=self.update_gantt).grid(row=0, column=2, padx=10)
-
-        self.canvas_frame = tk.Frame(self)
-        self.canvas_frame.pack(fill=tk.BOTH, expand=True)
-
-        self.draw_gantt_chart(self.task_list)
-
-    def draw_gantt_chart(self, tasks):
-        fig, ax = plt.subplots(figsize=(14, 8))
-        for i, (label, category, start, end) in enumerate(tasks):
-            duration = end - start
-            color = category_colors.get(category, 'gray')
-            ax.barh(i, duration, left=start, color=color, edgecolor='black')
-            ax.text(start + duration / 2, i, label, ha='center', va='center', fontsize=8)
-
-        ax.set_yticks(range(len(tasks)))
-        ax.set_yticklabels([t[0] for t in tasks])
-        ax.set_xlabel("Day")
-        ax.set_title("Seed Procurement Gantt Timeline")
-        ax.invert_yaxis()
-        ax.grid(True)
-
-        for widget in self.canvas_frame.winfo_children():
-            widget.destroy()
-
-        canvas = FigureCanvasTkAgg(fig, master=self.canvas_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-    def update_gantt(self):
-        decision = self.decision_var.get()
-        scheduled = resolve_task_schedule()
-        modified = apply_decision_logic(decision, scheduled) if decision != "None" else scheduled
-        self.draw_gantt_chart(modified)
-
-# Run the application
-if __name__ == "__main__":
-    app = GanttGUI()
-    app.mainloop()
+import tkinter as tk
+from tkinter import ttk
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from gantt_chart import GanttChart
+from gui_worker import ScheduleWorker
+from instrument import count, timed
+from interval_index import IntervalIndex
+from scenario_cache import ScenarioCache
+from scheduler import Schedule
+from workflows import category_colors, decision_delays, task_buckets
+
+# Delay simulation for the selected decision's delays; delays push all
+# dependent tasks. Runs on the worker thread.
+@timed("gui.delay")
+def apply_decision_logic(delay_map, schedule):
+    schedule.apply_delays(delay_map)
+    return schedule.snapshot()
+
+# Resolve tasks with support for multiple dependencies
+@timed("gui.resolve")
+def resolve_task_schedule():
+    return Schedule.from_buckets(task_buckets)
+
+# GUI Class
+class GanttGUI(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Seed Procurement Gantt Tracker")
+        self.geometry("1200x850")
+        self.schedule = resolve_task_schedule()
+        self.task_list = self.schedule.tasks()
+        self.index = None
+        self.planned_finish = self.schedule.makespan
+        self.scenarios = ScenarioCache()
+        self.worker = ScheduleWorker(self)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.build_ui()
+
+    def on_close(self):
+        stats = self.scenarios.stats()
+        for key in ("hits", "misses", "evictions"):
+            count(f"gui.cache.{key}", stats[key])
+        self.worker.shutdown()
+        self.destroy()
+
+    def build_ui(self):
+        control_frame = tk.Frame(self)
+        control_frame.pack(pady=10)
+
+        tk.Label(control_frame, text="Simulate Delay Scenario:").grid(row=0, column=0, padx=10)
+        self.decision_var = tk.StringVar()
+        self.decision_combo = ttk.Combobox(control_frame, textvariable=self.decision_var)
+        self.decision_combo['values'] = ["None", "Vendor Delay", "Rain Delay", "Cost Issue"]
+        self.decision_combo.set("None")
+        self.decision_combo.grid(row=0, column=1, padx=10)
+
+        ttk.Button(control_frame, text="Update Gantt", command=self.update_gantt).grid(row=0, column=2, padx=10)
+
+        self.finish_var = tk.StringVar()
+        tk.Label(control_frame, textvariable=self.finish_var).grid(row=0, column=3, padx=10)
+
+        self.active_var = tk.StringVar(value="Click the chart to list the tasks running that day")
+        tk.Label(control_frame, textvariable=self.active_var).grid(row=1, column=0, columnspan=4, pady=(5, 0))
+
+        self.canvas_frame = tk.Frame(self)
+        self.canvas_frame.pack(fill=tk.BOTH, expand=True)
+
+        # One figure and canvas for the window's lifetime; updates move bars in place
+        self.chart = GanttChart("Seed Procurement Gantt Timeline", "Day", category_colors, figsize=(14, 8), fontsize=8)
+        canvas = FigureCanvasTkAgg(self.chart.figure, master=self.canvas_frame)
+        self.chart.attach(canvas)
+        canvas.mpl_connect("button_press_event", self.show_active)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        result = self.schedule.snapshot()
+        self.scenarios.put(self.schedule.version, {}, result)
+        self.show_result(result)
+
+    def draw_gantt_chart(self, tasks, critical=()):
+        self.task_list = tasks
+        self.index = None
+        self.chart.update(tasks, critical)
+
+    # Critical tasks are outlined in red; the label shows the finish-day slip
+    def show_result(self, result):
+        tasks, critical, finish = result
+        self.finish_var.set(f"Finish: day {finish:g} (+{finish - self.planned_finish:g})")
+        self.draw_gantt_chart(tasks, critical)
+
+    # Clicking the chart lists the tasks running on that day
+    def show_active(self, event):
+        if event.inaxes is not self.chart.ax or event.xdata is None:
+            return
+        if self.index is None:
+            self.index = IntervalIndex.from_tasks(self.task_list)
+        names = [self.task_list[i][0] for i in self.index.active_at(event.xdata).tolist()]
+        self.active_var.set(f"Day {event.xdata:.1f}: {', '.join(names) or 'nothing running'}")
+
+    # Decisions already seen come straight from the cache; anything new is
+    # rescheduled on the worker thread and only the redraw happens here
+    def update_gantt(self):
+        delay_map = decision_delays.get(self.decision_var.get(), {})
+        version = self.schedule.version
+        cached = self.scenarios.get(version, delay_map)
+        if cached is not None:
+            self.worker.cancel("decision")
+            self.show_result(cached)
+            return
+
+        def compute():
+            result = apply_decision_logic(delay_map, self.schedule)
+            self.scenarios.put(version, delay_map, result)
+            return result
+
+        self.worker.submit("decision", compute, self.show_result)
+
+# Run the application
+if __name__ == "__main__":
+    app = GanttGUI()
+    app.mainloop()
@@ -1,180 +1,187 @@
-import tkinter as tk
-from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-# Combined task buckets from all systems
-combined_task_buckets = {
-    "Seed Planning": [
-        ("Seed Procurement", 0, 2),
-        ("Certified Vendor", "Seed Procurement", 2),
-        ("Crop Variety Suitability", "Certified Vendor", 3),
-        ("Cost & Availability", "Crop Variety Suitability", 2),
-        ("Vendor Approval", "Certified Vendor", 1),
-        ("Logistics Planning", "Seed Procurement", 2)
-    ],
-    "Compost Planning": [
-        ("Crop & Soil Analysis", 0, 5),
-        ("Compost Requirement", "Crop & Soil Analysis", 2),
-        ("Decision Tree Finalization", "Compost Requirement", 3),
-        ("Gobar Procurement", "Decision Tree Finalization", 4),
-        ("Green Manure Collection", "Decision Tree Finalization", 4),
-        ("Pit Readiness", "Decision Tree Finalization", 3),
-        ("Compost Mixing", "Gobar Procurement", 2),
-        ("Pit Monitoring", "Compost Mixing", 36),
-        ("Tractor Preparation", "Pit Monitoring", 1),
-        ("Rotavator Check", "Tractor Preparation", 1),
-        ("Field Prep & Compost Application", "Rotavator Check", 4),
-        ("Sowing Preparation", "Field Prep & Compost Application", 3)
-    ],
-    "Soil Testing": [
-        ("Soil Testing", 0, 2),
-        ("PH-Level", "Soil Testing", 2),
-        ("NPK Balance", "Soil Testing", 2),
-        ("Organic Carbon", "Soil Testing", 2)
-    ]
-}
-
-combined_category_colors = {
-    "Seed Planning": "cornflowerblue",
-    "Compost Planning": "lightgreen",
-    "Soil Testing": "lightpink"
-}
-
-def resolve_combined_schedule():
-    flat = []
-    task_end = {}
-    for category, items in combined_task_buckets.items():
-        for task in items:
-            name = task[0]
-            if isinstance(task[1], str):
-                depends_on = task[1]
-                duration = task[2]
-                start = task_end[depends_on]
-                end = start + duration
-            else:
-                start = task[1]
-                end = task[2]
-            flat.append((name, category, start, end))
-            task_end[name] = end
-    return flat
-
-def apply_delay_logic(decision_map, task_list, category):
-    delay_map = decision_map
-    task_end = {}
-    updated = []
-
-    for t in task_list:
-        name, cat, start, end = t
-        if cat == category:
-            delay = delay_map.get(name, 0)
-            start += delay
-            end += delay
-        updated.append((name, cat, start, end))
-        task_end[name] = end
-
-    return updated
-
-class UnifiedGanttApp(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Unified Gantt Chart with Soil Testing")
-        self.geometry("1400x1000")
-        self.base_tasks = resolve_combined_schedule()
-        self.build_ui()
-
-    def build_ui(self):
-        notebook = ttk.Notebook(self)
-        notebook.pack(fill=tk.BOTH, expand=True)
-
-        self.tabs = {}
-        for category in combined_task_buckets:
-            tab = tk.Frame(notebook)
-            notebook.add(tab, text=category)
-            self.tabs[category] = tab
-
-        self.control_vars = {}
-        for cat in self.tabs:
-            self.create_controls(cat, self.tabs[cat])
-
-    def create_controls(self, category, tab):
-        frame = tk.Frame(tab)
-        frame.pack(pady=10)
-
-        tk.Label(frame, text=f"{category} Delay Trigger:").grid(row=0, column=0, padx=10)
-        var = tk.StringVar()
-        combo = ttk.Combobox(frame, textvariable=var)
-
-        if category == "Seed Planning":
-            combo['values'] = ["None", "Vendor Delay", "Cost Issue", "Rain Delay"]
-        elif category == "Compost Planning":
-            combo['values'] = ["None", "Compost Immature", "Power Failure", "Gobar Vendor Delay", "Labour Shortage"]
-        elif category == "Soil Testing":
-            combo['values'] = ["None", "Lab Delay", "Sensor Malfunction"]
-
-        combo.set("None")
-        combo.grid(row=0, column=1, padx=10)
-        ttk.Button(frame, text="Apply", command=lambda c=category, v=var: self.update_gantt(c, v)).grid(row=0, column=2, padx=10)
-
-        canvas = tk.Frame(tab)
-        canvas.pack(fill=tk.BOTH, expand=True)
-        self.draw_gantt_chart(self.base_tasks, canvas, category)
-        self.control_vars[category] = (var, canvas)
-
-    def draw_gantt_chart(self, tasks, container, category):
-        filtered = [t for t in tasks if t[1] == category]
-        fig, ax = plt.subplots(figsize=(16, 8))
-        for i, (label, cat, start, end) in enumerate(filtered):
-            duration = end - start
-            color = combined_category_colors.get(cat, 'gray')
-            ax.barh(i, duration, left=start, color=color, edgecolor='black')
-            ax.text(start + duration / 2, i, label, ha='center', va='center', fontsize=9)
-
-        ax.set_yticks(range(len(filtered)))
-        ax.set_yticklabels([t[0] for t in filtered])
-        ax.set_xlabel("Day Number")
-        ax.set_title(f"Gantt Chart: {category}")
-        ax.invert_yaxis()
-        ax.grid(True)
-
-        for widget in container.winfo_children():
-            widget.destroy()
-
-        canvas = FigureCanvasTkAgg(fig, master=container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-    def update_gantt(self, category, var):
-        decision = var.get()
-        delay_map = {}
-
-        if category == "Seed Planning":
-            if decision == "Vendor Delay":
-                delay_map = {"Certified Vendor": 2}
-            elif decision == "Cost Issue":
-                delay_map = {"Cost & Availability": 1}
-            elif decision == "Rain Delay":
-                delay_map = {"Logistics Planning": 3}
-
-        elif category == "Compost Planning":
-            if decision == "Compost Immature":
-                delay_map = {"Field Prep & Compost Application": 7, "Sowing Preparation": 7}
-            elif decision == "Power Failure":
-                delay_map = {"Decision Tree Finalization": 2}
-            elif decision == "Gobar Vendor Delay":
-                delay_map = {"Gobar Procurement": 3}
-            elif decision == "Labour Shortage":
-                delay_map = {"Compost Mixing": 2, "Pit Readiness": 2}
-
-        elif category == "Soil Testing":
-            if decision == "Lab Delay":
-                delay_map = {"PH-Level": 2, "NPK Balance": 2, "Organic Carbon": 2}
-            elif decision == "Sensor Malfunction":
-                delay_map = {"Soil Testing": 3}
-
-        updated = apply_delay_logic(delay_map, resolve_combined_schedule(), category)
-        self.draw_gantt_chart(updated, self.control_vars[category][1], category)
-
-if __name__ == "__main__":
-    app = UnifiedGanttApp()
-    app.mainloop()
+import time
+import tkinter as tk
+from tkinter import ttk
+from gui_worker import ScheduleWorker
+import instrument
+from instrument import count, timed
+from interval_index import IntervalIndex
+from scenario_cache import ScenarioCache
+from scheduler import Schedule
+from workflows import combined_category_colors, combined_task_buckets, scenario_delays
+
+# Reference point for the reported time-to-first-window
+process_start = time.perf_counter()
+
+@timed("gui.resolve")
+def resolve_combined_schedule():
+    return Schedule.from_buckets(combined_task_buckets, numeric_end=True)
+
+# Apply the delays active on every tab at once; each delay also pushes every
+# task that depends on the delayed one. Runs on the worker thread.
+@timed("gui.delay")
+def apply_delay_logic(delay_map, schedule):
+    schedule.apply_delays(delay_map)
+    return schedule.snapshot()
+
+def merged_delays(active_delays):
+    merged = {}
+    for delays in active_delays.values():
+        merged.update(delays)
+    return merged
+
+class UnifiedGanttApp(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Unified Gantt Chart with Soil Testing")
+        self.geometry("1400x1000")
+        self.schedule = resolve_combined_schedule()
+        self.base_tasks = self.schedule.tasks()
+        self.planned_finish = self.schedule.makespan
+        self.result = self.schedule.snapshot()
+        self.finish_vars = {}
+        self.active_vars = {}
+        self.indexes = {}
+        self.stale = set()
+        self.active_delays = {}
+        self.scenarios = ScenarioCache()
+        self.scenarios.put(self.schedule.version, {}, self.result)
+        self.worker = ScheduleWorker(self)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.build_ui()
+        self.bind("<Map>", self.report_startup, add="+")
+
+    def on_close(self):
+        stats = self.scenarios.stats()
+        for key in ("hits", "misses", "evictions"):
+            count(f"gui.cache.{key}", stats[key])
+        self.worker.shutdown()
+        self.destroy()
+
+    def report_startup(self, event):
+        if event.widget is self:
+            self.unbind("<Map>")
+            instrument.record("gui.first_window", time.perf_counter() - process_start)
+            self.after_idle(self.on_tab_changed, None)
+
+    def build_ui(self):
+        self.notebook = notebook = ttk.Notebook(self)
+        notebook.pack(fill=tk.BOTH, expand=True)
+
+        self.tabs = {}
+        for category in combined_task_buckets:
+            tab = tk.Frame(notebook)
+            notebook.add(tab, text=category)
+            self.tabs[category] = tab
+
+        self.control_vars = {}
+        self.charts = {}
+        for cat in self.tabs:
+            self.create_controls(cat, self.tabs[cat])
+
+        # Charts are drawn the first time their tab is shown; the initial tab
+        # is drawn once the window is up
+        notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.show_result(self.result)
+
+    def create_controls(self, category, tab):
+        frame = tk.Frame(tab)
+        frame.pack(pady=10)
+
+        tk.Label(frame, text=f"{category} Delay Trigger:").grid(row=0, column=0, padx=10)
+        var = tk.StringVar()
+        combo = ttk.Combobox(frame, textvariable=var)
+        combo['values'] = ["None"] + list(scenario_delays.get(category, {}))
+        combo.set("None")
+        combo.grid(row=0, column=1, padx=10)
+        ttk.Button(frame, text="Apply", command=lambda c=category, v=var: self.update_gantt(c, v)).grid(row=0, column=2, padx=10)
+
+        self.finish_vars[category] = tk.StringVar()
+        tk.Label(frame, textvariable=self.finish_vars[category]).grid(row=0, column=3, padx=10)
+
+        self.active_vars[category] = tk.StringVar(value="Click the chart to list the tasks running that day")
+        tk.Label(frame, textvariable=self.active_vars[category]).grid(row=1, column=0, columnspan=4, pady=(5, 0))
+
+        container = tk.Frame(tab)
+        container.pack(fill=tk.BOTH, expand=True)
+
+        self.control_vars[category] = (var, container)
+
+    def current_tab(self):
+        return self.notebook.tab(self.notebook.select(), "text")
+
+    # A tab whose chart missed a result while hidden is redrawn when shown
+    def on_tab_changed(self, event):
+        category = self.current_tab()
+        if category not in self.charts:
+            self.render_tab(category)
+        else:
+            self.draw_gantt_chart(category)
+
+    def render_tab(self, category):
+        # Plotting libraries load with the first chart, not with the window
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from gantt_chart import GanttChart
+
+        # Each tab keeps one figure and canvas; updates move bars in place
+        container = self.control_vars[category][1]
+        chart = GanttChart(f"Gantt Chart: {category}", "Day Number", combined_category_colors, figsize=(16, 8), fontsize=9)
+        canvas = FigureCanvasTkAgg(chart.figure, master=container)
+        chart.attach(canvas)
+        canvas.mpl_connect("button_press_event", lambda event: self.show_active(event, category))
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.charts[category] = chart
+        self.stale.add(category)
+        self.draw_gantt_chart(category)
+
+    def draw_gantt_chart(self, category):
+        if category in self.stale:
+            self.stale.discard(category)
+            tasks, critical, _ = self.result
+            self.charts[category].update([t for t in tasks if t[1] == category], critical)
+
+    # Every tab's label shows the plan's finish-day slip; only the visible
+    # chart is redrawn now, the others when their tab is next shown. Critical
+    # tasks are outlined in red.
+    def show_result(self, result):
+        self.result = tasks, critical, finish = result
+        self.indexes.clear()
+        for var in self.finish_vars.values():
+            var.set(f"Finish: day {finish:g} (+{finish - self.planned_finish:g})")
+        self.stale = set(self.charts)
+        self.draw_gantt_chart(self.current_tab())
+
+    # Clicking a chart lists that tab's tasks running on the clicked day
+    def show_active(self, event, category):
+        if event.inaxes is not self.charts[category].ax or event.xdata is None:
+            return
+        tasks = [t for t in self.result[0] if t[1] == category]
+        if category not in self.indexes:
+            self.indexes[category] = IntervalIndex.from_tasks(tasks)
+        names = [tasks[i][0] for i in self.indexes[category].active_at(event.xdata).tolist()]
+        self.active_vars[category].set(f"Day {event.xdata:.1f}: {', '.join(names) or 'nothing running'}")
+
+    # Scenarios already seen come straight from the cache; anything new is
+    # rescheduled on the worker thread and cached when it comes back. Delays
+    # from every tab make up one scenario, so all tabs share one worker key:
+    # repeated clicks anywhere collapse into the latest request, and a cache
+    # hit drops whatever is still in flight
+    def update_gantt(self, category, var):
+        self.active_delays[category] = scenario_delays.get(category, {}).get(var.get(), {})
+        delay_map = merged_delays(self.active_delays)
+        version = self.schedule.version
+        cached = self.scenarios.get(version, delay_map)
+        if cached is not None:
+            self.worker.cancel("scenario")
+            self.show_result(cached)
+            return
+
+        def compute():
+            result = apply_delay_logic(delay_map, self.schedule)
+            self.scenarios.put(version, delay_map, result)
+            return result
+
+        self.worker.submit("scenario", compute, self.show_result)
+
+if __name__ == "__main__":
+    app = UnifiedGanttApp()
+    app.mainloop()
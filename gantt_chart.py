@@ -0,0 +1,267 @@
+import math
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+from instrument import count, timed
+from scheduler import field_separator
+
+summary_colors = np.array([to_rgba("lightsteelblue"), to_rgba("lightcoral")])
+edge_colors = np.array([to_rgba("black"), to_rgba("red")])
+
+
+# [x0, x1] x [y0, y1] rectangles as an (n, 4, 2) vertex array
+def rectangles(x0, x1, y0, y1):
+    return np.stack([np.column_stack([x0, y0]), np.column_stack([x0, y1]),
+                     np.column_stack([x1, y1]), np.column_stack([x1, y0])], axis=1)
+
+
+# One long-lived Gantt figure per view, sized for plans of any length. All bars
+# are one PolyCollection holding only the rows in view, and bar labels and
+# y ticks are only made for those rows. When rows get thinner than
+# min_row_pixels, the bars are merged into one summary bar per run of a field
+# (or, in single-field plans, a category), red where the run holds a critical
+# task. The mouse wheel scrolls rows, Ctrl+wheel zooms the time
+# axis and Shift+wheel zooms the rows; Home shows the whole plan again.
+# Bars and labels are animated artists: scenario changes redraw just them over
+# a saved background, and the figure is redrawn in full only when the task
+# list, the view or the x-range changes. Headless renders pass animated=False
+# so a plain savefig includes the bars.
+class GanttChart:
+    # Bars thinner than this on screen are summarised
+    min_row_pixels = 3
+    # Most bar labels drawn at once
+    label_rows = 150
+    bar_height = 0.8
+
+    def __init__(self, title, xlabel, category_colors, figsize=(14, 8), fontsize=8, animated=True):
+        self.figure = Figure(figsize=figsize)
+        count("figures_allocated")
+        self.ax = self.figure.add_subplot()
+        self.title = title
+        self.xlabel = xlabel
+        self.category_colors = category_colors
+        self.fontsize = fontsize
+        self.animated = animated
+        self.canvas = None
+        self.background = None
+        self.names = []
+        self.start = np.zeros(0)
+        self.end = np.zeros(0)
+        self.critical = np.zeros(0, dtype=bool)
+        self.colors = np.zeros((0, 4))
+        self.groups = np.zeros(0, dtype=np.int64)
+        self.group_names = []
+        self.bars = None
+        self.labels = []
+        self.view = (0, 0)
+        self.summarised = False
+
+    # Bind to a FigureCanvasTkAgg (or any blit-capable canvas) created once
+    def attach(self, canvas):
+        self.canvas = canvas
+        canvas.mpl_connect("draw_event", self._on_draw)
+        canvas.mpl_connect("scroll_event", self._on_scroll)
+        canvas.mpl_connect("key_press_event", self._on_key)
+        canvas.mpl_connect("resize_event", lambda event: self._on_view(self.ax))
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        if self.bars is None:
+            return
+        self.ax.draw_artist(self.bars)
+        for label in self.labels:
+            if label.get_visible():
+                self.ax.draw_artist(label)
+
+    def _set_xlim(self):
+        low = float(self.start.min(initial=0))
+        high = float(self.end.max(initial=1))
+        margin = max(1, (high - low) * 0.05)
+        self.ax.set_xlim(min(0, low), high + margin)
+
+    def _fits(self, start, end):
+        low, high = self.ax.get_xlim()
+        return bool(np.all(start >= low) and np.all(end <= high))
+
+    # Per-row colours, and the field or category run each row is summarised in
+    def _set_rows(self, tasks, critical):
+        self.names = [t[0] for t in tasks]
+        self.start = np.array([t[2] for t in tasks], dtype=float)
+        self.end = np.array([t[3] for t in tasks], dtype=float)
+        self.critical = np.array([name in critical for name in self.names], dtype=bool)
+        palette = {}
+        self.colors = np.array([
+            palette.get(c) or palette.setdefault(c, to_rgba(self.category_colors.get(c, "gray")))
+            for _, c, _, _ in tasks
+        ]).reshape(-1, 4)
+        keys = [name.split(field_separator, 1)[0] if field_separator in name else category
+                for name, category, _, _ in tasks]
+        self.group_names, self.groups = np.unique(np.array(keys, dtype=object), return_inverse=True)
+        self.groups = self.groups.reshape(-1)
+
+    # Rebuild every artist; used for the first draw and when the rows change.
+    # Tasks named in `critical` get a red outline.
+    @timed("render.draw")
+    def draw(self, tasks, critical=()):
+        ax = self.ax
+        ax.cla()
+        self._set_rows(tasks, critical)
+        self.bars = PolyCollection(np.zeros((0, 4, 2)), animated=self.animated)
+        ax.add_collection(self.bars)
+        self.labels = []
+        ax.yaxis.set_major_locator(MaxNLocator(integer=True, steps=[1, 2, 5, 10]))
+        ax.yaxis.set_major_formatter(FuncFormatter(self._tick_label))
+        ax.set_xlabel(self.xlabel)
+        ax.set_title(self.title)
+        ax.grid(True)
+        self._set_xlim()
+        # cla() drops callbacks, so the view hook is reattached on every draw
+        ax.callbacks.connect("ylim_changed", self._on_view)
+        ax.set_ylim(max(len(tasks), 1) - 0.5, -0.5)
+        if self.canvas is not None:
+            self.canvas.draw_idle()
+
+    # Move existing bars; falls back to a full draw when the layout changed
+    @timed("render.update")
+    def update(self, tasks, critical=()):
+        start = np.array([t[2] for t in tasks], dtype=float)
+        end = np.array([t[3] for t in tasks], dtype=float)
+        if [t[0] for t in tasks] != self.names or not self._fits(start, end):
+            self.draw(tasks, critical)
+            return
+        flags = np.array([name in critical for name in self.names], dtype=bool)
+        if np.array_equal(start, self.start) and np.array_equal(end, self.end) and np.array_equal(flags, self.critical):
+            return
+        self.start, self.end, self.critical = start, end, flags
+        self._refresh()
+        self.blit()
+
+    # Task names, or the field/category a row belongs to when summarised
+    def _tick_label(self, y, pos=None):
+        i = int(round(y))
+        if abs(y - i) > 1e-6 or not 0 <= i < len(self.names):
+            return ""
+        return self.group_names[self.groups[i]] if self.summarised else self.names[i]
+
+    # Rows [first, last) that intersect the current y-limits
+    def _visible_rows(self):
+        low, high = sorted(self.ax.get_ylim())
+        first = max(0, math.ceil(low - 0.5))
+        last = min(len(self.names), math.floor(high + 0.5) + 1)
+        return first, max(first, last)
+
+    def _on_view(self, ax):
+        self.view = self._visible_rows()
+        # As many y ticks as fit at the tick font size, each on a row
+        size = FontProperties(size=rcParams["ytick.labelsize"]).get_size_in_points()
+        ax.yaxis.get_major_locator().set_params(nbins=max(1, int(ax.bbox.height * 72 / self.figure.dpi / (size * 1.2))))
+        self._refresh()
+
+    # Bars and labels for the rows in view: one bar per task, or one per run
+    # of consecutive rows in the same group when there are too many to read
+    def _refresh(self):
+        if self.bars is None:
+            return
+        first, last = self.view
+        half = self.bar_height / 2
+        rows = np.arange(first, last)
+        fit = max(1, int(self.ax.bbox.height / self.min_row_pixels))
+        self.summarised = last - first > fit
+        if not self.summarised:
+            x0, x1 = self.start[first:last], self.end[first:last]
+            y0, y1 = rows - half, rows + half
+            colors, critical = self.colors[first:last], self.critical[first:last]
+            texts = [self.names[i] for i in rows.tolist()]
+        else:
+            groups = self.groups[first:last]
+            runs = np.flatnonzero(np.diff(groups, prepend=-1))
+            # Still too many runs: merge every `step` runs into one bar
+            step = max(1, -(-len(runs) // fit))
+            runs = runs[::step]
+            ends = np.append(runs[1:], len(groups)) - 1
+            x0 = np.minimum.reduceat(self.start[first:last], runs)
+            x1 = np.maximum.reduceat(self.end[first:last], runs)
+            y0, y1 = rows[runs] - half, rows[ends] + half
+            critical = np.logical_or.reduceat(self.critical[first:last], runs)
+            colors = summary_colors[critical.astype(np.int64)]
+            texts = [self.group_names[g] for g in groups[runs].tolist()] if step == 1 else []
+        self.bars.set_verts(rectangles(x0, x1, y0, y1))
+        self.bars.set_facecolors(colors)
+        if self.summarised:
+            self.bars.set_edgecolors(colors)
+            self.bars.set_linewidths(0)
+        else:
+            self.bars.set_edgecolors(edge_colors[critical.astype(np.int64)])
+            self.bars.set_linewidths(np.where(critical, 2.0, 1.0))
+        # Label only bars at least as tall as the label text
+        low, high = self.ax.get_ylim()
+        row_pixels = self.ax.bbox.height / max(abs(high - low), 1e-9)
+        tall = (y1 - y0 + 1 - self.bar_height) * row_pixels >= self.fontsize * self.figure.dpi / 72
+        keep = np.flatnonzero(tall[:len(texts)])[:self.label_rows]
+        self._place_labels([texts[k] for k in keep.tolist()], ((x0 + x1) / 2)[keep], ((y0 + y1) / 2)[keep])
+
+    # Reuse a pool of text artists for the labels in view
+    def _place_labels(self, texts, xs, ys):
+        while len(self.labels) < len(texts):
+            label = self.ax.text(0, 0, "", ha="center", va="center", fontsize=self.fontsize,
+                                 animated=self.animated, clip_on=True)
+            self.labels.append(label)
+        for label, text, x, y in zip(self.labels, texts, xs.tolist(), ys.tolist()):
+            label.set_text(text)
+            label.set_position((x, y))
+            label.set_visible(True)
+        for label in self.labels[len(texts):]:
+            label.set_visible(False)
+
+    # Restore the clean background and redraw the bars and labels over it
+    def blit(self):
+        if self.canvas is None or self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.ax.bbox)
+
+    def show_rows(self, first, last):
+        self.ax.set_ylim(last - 0.5, first - 0.5)
+        if self.canvas is not None:
+            self.canvas.draw_idle()
+
+    def reset_view(self):
+        self._set_xlim()
+        self.show_rows(0, len(self.names))
+
+    def _on_scroll(self, event):
+        if event.inaxes is not self.ax or not self.names:
+            return
+        ax = self.ax
+        zoom = 0.8 ** event.step
+        if event.key == "control":
+            low, high = ax.get_xlim()
+            x = event.xdata
+            ax.set_xlim(x - (x - low) * zoom, x + (high - x) * zoom)
+            self.canvas.draw_idle()
+            return
+        top, bottom = min(ax.get_ylim()), max(ax.get_ylim())
+        if event.key == "shift":
+            y = event.ydata
+            top, bottom = y - (y - top) * zoom, y + (bottom - y) * zoom
+        else:
+            shift = -event.step * max(1.0, (bottom - top) * 0.1)
+            top, bottom = top + shift, bottom + shift
+        span = min(bottom - top, len(self.names))
+        top = min(max(top, -0.5), len(self.names) - 0.5 - span)
+        ax.set_ylim(top + span, top)
+        self.canvas.draw_idle()
+
+    def _on_key(self, event):
+        if event.key == "home":
+            self.reset_view()
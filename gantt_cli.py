@@ -0,0 +1,136 @@
+import argparse
+import os
+import time
+
+import instrument
+
+# One entry point for the headless jobs:
+#   python gantt_cli.py schedule [--fields fields.csv] [--csv out.csv]
+#   python gantt_cli.py export   [fields.csv] [--out path] [--combined]
+#   python gantt_cli.py render   [fields.csv] [--out dir] [--format svg]
+#   python gantt_cli.py simulate [--plan Field-preprep.py] [--scenarios 10000] [--history dir]
+#   python gantt_cli.py serve    [--port 8765] [--workers 4]
+#   python gantt_cli.py update   plan.xlsm "Task=2; Other Task=1" [--out copy.xlsm]
+# Commands that have a script of their own take their arguments from that
+# module's add_arguments(), so both entry points parse the same options.
+# Building the parser loads those modules and numpy, which every command
+# needs; xlsxwriter, matplotlib and Tk load only with the command that uses
+# them, so a cron export never pays for matplotlib or Tk.
+
+
+def run_schedule(args):
+    import csv
+    from batch_gantt import calendar_spec
+    from progress_log import build_plan
+
+    schedule = build_plan(args.template, args.fields)
+    critical = set(schedule.critical_path())
+    rows = [
+        (name, category, start, end, round(slack, 6), "Yes" if name in critical else "")
+        for (name, category, start, end), slack in zip(schedule.tasks(), schedule.floats())
+    ]
+    header = ["Task", "Category", "Start", "End", "Total Float", "Critical"]
+    calendars = calendar_spec(args)
+    if calendars:
+        import numpy as np
+        from work_calendar import region_calendar
+
+        first, last = region_calendar(args.region, *calendars).span_dates(schedule.start, schedule.end)
+        rows = [row + dates for row, dates in zip(rows, zip(np.datetime_as_string(first).tolist(),
+                                                            np.datetime_as_string(last).tolist()))]
+        header += ["Start Date", "End Date"]
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    elif not args.quiet:
+        for name, category, start, end, slack, flag, *dates in rows:
+            print(f"{name:<40} {category:<20} {start:>8g} {end:>8g} {slack:>8g} {flag:<3} {' '.join(dates)}")
+    print(f"{len(schedule)} tasks, finish day {schedule.makespan:g}, {len(critical)} on the critical path")
+
+
+# Delay causes come from the plan: the fifth column of a Field-preprep style
+# task list, or the Cause column of a planning workbook. With --history the
+# cause models fitted from recorded seasons replace the built-in ones.
+def run_simulate(args):
+    from delay_risk import cause_models, field_preprep_plan, print_summary, simulate
+
+    if args.plan and args.plan.lower().endswith((".xlsx", ".xlsm")):
+        from scheduler import Schedule
+        from workbook_loader import load_rows
+
+        rows = load_rows(args.plan)
+        schedule, causes = Schedule.from_rows(rows), {row[0]: row[4] for row in rows}
+    else:
+        schedule, causes = field_preprep_plan(args.plan)
+    models = None
+    if args.history:
+        from history_store import HistoryStore, fit_cause_models
+
+        fitted = fit_cause_models(HistoryStore(args.history))
+        print(f"Delay models for {len(fitted)} cause(s) fitted from {args.history}")
+        models = {**cause_models, **fitted}
+    result = simulate(schedule, causes, args.scenarios, workers=args.workers or os.cpu_count(), seed=args.seed,
+                      models=models)
+    print_summary(result, causes, args.top)
+
+
+def build_parser():
+    import batch_gantt
+    import gantt_render
+    import whatif_service
+    import workbook_update
+
+    parser = argparse.ArgumentParser(description="Schedule, export, render and simulate field workflows")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    schedule = commands.add_parser("schedule", help="resolve a plan and list its tasks")
+    schedule.add_argument("--template", default="combined", help=batch_gantt.templates_help)
+    schedule.add_argument("--fields", help="CSV of fields to merge into one plan")
+    schedule.add_argument("--csv", help="write the task table to this CSV instead of printing it")
+    schedule.add_argument("--quiet", action="store_true", help="print only the summary line")
+    batch_gantt.add_calendar_arguments(schedule)
+    schedule.set_defaults(run=run_schedule)
+
+    export = commands.add_parser("export", help="write Gantt workbooks")
+    batch_gantt.add_arguments(export)
+    export.set_defaults(run=batch_gantt.run)
+
+    render = commands.add_parser("render", help="draw Gantt charts to image files")
+    gantt_render.add_arguments(render)
+    render.set_defaults(run=gantt_render.run)
+
+    simulate = commands.add_parser("simulate", help="Monte Carlo delay risk for a plan")
+    simulate.add_argument("--plan", help="Field-preprep style script or planning workbook (default Field-preprep.py)")
+    simulate.add_argument("--scenarios", type=int, default=10000)
+    simulate.add_argument("--workers", type=int, default=None)
+    simulate.add_argument("--seed", type=int, default=None)
+    simulate.add_argument("--top", type=int, default=10, help="critical-path tasks to list")
+    simulate.add_argument("--history", help="history directory to fit the delay models from")
+    simulate.set_defaults(run=run_simulate)
+
+    serve = commands.add_parser("serve", help="answer what-if requests over HTTP from one shared plan")
+    whatif_service.add_arguments(serve)
+    serve.set_defaults(run=whatif_service.run)
+
+    update = commands.add_parser("update", help="apply delay edits to a planning workbook in place, keeping macros")
+    workbook_update.add_arguments(update)
+    update.set_defaults(run=workbook_update.run)
+
+    for command in (schedule, export, render, simulate, serve, update):
+        instrument.add_arguments(command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    instrument.configure(args)
+    t0 = time.perf_counter()
+    args.run(args)
+    if args.command != "schedule":
+        print(f"Done in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import math
+import warnings
+
+import numpy as np
+import xlsxwriter
+from xlsxwriter.utility import xl_col_to_name
+
+from instrument import count, span, timed
+from interval_index import IntervalIndex, slot_range
+
+bar_style = {'border': 1, 'align': 'center', 'valign': 'vcenter'}
+header_style = {'bold': True, 'border': 1}
+load_style = {'border': 1, 'align': 'center', 'font_color': '#595959'}
+
+# Timeline resolutions, finest first: (name, days per cell, header label). A
+# label gets the cell's start day positionally and day, hour and week by name.
+timeline_scales = [
+    ("hours", 1 / 24, "Day {day} {hour:02d}:00"),
+    ("half-days", 0.5, "Day {0:.1f}"),
+    ("days", 1, "Day {0:g}"),
+    ("weeks", 7, "Week {week}"),
+]
+
+# Most timeline cells an automatically chosen resolution may use
+max_timeline_cells = 180
+
+# Excel's column limit
+max_columns = 16384
+
+
+# Pick the coarsest resolution up to whole days whose cell edges every start
+# and end falls on, then coarsen further (to weeks if need be) while the
+# horizon needs more than max_cells cells
+def choose_scale(starts, ends, max_cells=max_timeline_cells):
+    bounds = np.concatenate([np.asarray(starts, dtype=float), np.asarray(ends, dtype=float)])
+    horizon = bounds.max(initial=0)
+    k = 0
+    for i, (_, step, _) in enumerate(timeline_scales):
+        cells = bounds / step
+        if step <= 1 and np.allclose(cells, np.round(cells), atol=1e-6):
+            k = i
+    while k < len(timeline_scales) - 1 and math.ceil(horizon / timeline_scales[k][1] - 1e-9) > max_cells:
+        k += 1
+    return timeline_scales[k]
+
+
+def timeline_label(label, day):
+    whole = math.floor(day + 1e-9)
+    return label.format(day, day=whole, hour=round((day - whole) * 24), week=int(day // 7) + 1)
+
+
+# Excel Gantt writer shared by the export scripts. Formats are created once per
+# colour and reused, every data row goes out in a single write_row and every
+# bar is one merged range.
+class GanttWriter:
+    def __init__(self, path, options=None):
+        self.workbook = xlsxwriter.Workbook(path, options or {})
+        self.formats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with span("export.save"):
+            self.workbook.close()
+
+    def format(self, key, props):
+        fmt = self.formats.get(key)
+        if fmt is None:
+            fmt = self.formats[key] = self.workbook.add_format(props)
+            count("formats_created")
+        return fmt
+
+    def bar_format(self, color):
+        return self.format(("bar", color), dict(bar_style, bg_color=color))
+
+    # rows are tuples laid out like columns. formulas maps a column to a template
+    # such as "={Start}+{Delay}", where each {Column} becomes that row's cell.
+    # The timeline starts after the last column, one cell per `step` days; by
+    # default the step comes from choose_scale() and the horizon from the last
+    # task, and tasks running past a fixed time_steps are reported.
+    # load_rows adds rows under the table counting the tasks in each timeline
+    # cell, in total and per category. spans, the (starts, ends, categories)
+    # of every row, lets rows be a one-pass iterator that is written as it
+    # arrives instead of a list held in memory.
+    @timed("export.sheet")
+    def add_sheet(self, name, columns, rows, category_colors, step=None, time_steps=None,
+                  day_label=None, formulas=None, validations=None,
+                  column_widths=(), timeline_width=10, default_color="#CCCCCC", load_rows=False, spans=None):
+        worksheet = self.workbook.add_worksheet(name)
+        col = {c: i for i, c in enumerate(columns)}
+        task_i, category_i = col["Task"], col["Category"]
+        start_i, duration_i = col["Start"], col["Duration"]
+        first_day = len(columns)
+
+        if spans is None:
+            starts = [row[start_i] for row in rows]
+            ends = [row[start_i] + row[duration_i] for row in rows]
+            categories = None
+        else:
+            starts, ends, categories = spans
+        n = len(starts)
+        if step is None:
+            _, step, scale_label = choose_scale(starts, ends)
+            day_label = day_label or scale_label
+        day_label = day_label or "Day {:g}"
+        first, last = slot_range(starts, ends, step)
+        horizon = int(last.max(initial=0))
+        if time_steps is None:
+            time_steps = horizon
+        time_steps = min(time_steps, max_columns - first_day)
+        if horizon > time_steps:
+            cut = int((last > time_steps).sum())
+            warnings.warn(f"{cut} task(s) in sheet {name!r} run past the {time_steps}-cell timeline "
+                          f"and are cut off at day {time_steps * step:g}", stacklevel=2)
+        first, last = np.maximum(first, 0), np.minimum(last, time_steps)
+        slots = list(zip(first.tolist(), last.tolist()))
+        count("cells_written", (n + 1) * len(columns) + time_steps + int(np.maximum(last - first, 0).sum()))
+
+        days = [timeline_label(day_label, i * step) for i in range(time_steps)]
+        worksheet.write_row(0, 0, list(columns) + days, self.format("header", header_style))
+
+        letters = {c: xl_col_to_name(i) for c, i in col.items()}
+        formula_items = [(col[c], template) for c, template in (formulas or {}).items()]
+        for r, (row, (first, last)) in enumerate(zip(rows, slots), start=1):
+            values = list(row)
+            if formula_items:
+                refs = {c: f"{letter}{r + 1}" for c, letter in letters.items()}
+                for i, template in formula_items:
+                    values[i] = template.format_map(refs)
+            worksheet.write_row(r, 0, values)
+            if last - first > 1:
+                fmt = self.bar_format(category_colors.get(row[category_i], default_color))
+                worksheet.merge_range(r, first_day + first, r, first_day + last - 1, row[task_i], fmt)
+            elif last > first:
+                fmt = self.bar_format(category_colors.get(row[category_i], default_color))
+                worksheet.write(r, first_day + first, row[task_i], fmt)
+
+        if load_rows and n:
+            if categories is None:
+                categories = [row[category_i] for row in rows]
+            self.write_load(worksheet, n + 2, first_day, IntervalIndex(starts, ends), categories, step, time_steps)
+
+        for c, options in (validations or {}).items():
+            if n:
+                worksheet.data_validation(1, col[c], n, col[c], options)
+        for cells, width in column_widths:
+            worksheet.set_column(cells, width)
+        if time_steps:
+            worksheet.set_column(first_day, first_day + time_steps - 1, timeline_width)
+        return worksheet
+
+    # Concurrent-task counts per timeline cell: a total row, then one per category
+    def write_load(self, worksheet, row, first_day, index, categories, step, time_steps):
+        fmt = self.format("load", load_style)
+        loads = [("Active tasks", index.load(step, cells=time_steps)[0])]
+        loads += [(f"Active: {c}", load) for c, load in index.category_load(categories, step, time_steps).items()]
+        count("cells_written", len(loads) * (time_steps + 1))
+        for r, (label, load) in enumerate(loads, start=row):
+            worksheet.write_row(r, 0, [label])
+            worksheet.write_row(r, first_day, [int(v) or "" for v in load.round()], fmt)
+
+
+# ("Total Float", "Critical") cell values per task, in declaration order
+def float_cells(schedule, tolerance=1e-9):
+    return [(round(slack, 6), "Yes" if slack <= tolerance else "") for slack in schedule.floats()]
+
+
+# Write a single-sheet Gantt workbook
+def write_gantt_workbook(path, sheet_name, columns, rows, category_colors, options=None, **sheet_options):
+    with GanttWriter(path, options) as writer:
+        writer.add_sheet(sheet_name, columns, rows, category_colors, **sheet_options)
+    return path
@@ -0,0 +1,119 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import instrument
+from batch_gantt import build_template, palette, plan_field, read_fields, template_stem, templates_help
+from instrument import span
+
+formats = ("png", "svg", "pdf")
+
+# Fields handed to a worker at a time
+chunk_size = 20
+
+# Each worker process keeps one chart and canvas and redraws it for every job
+_chart = None
+
+
+def _worker_chart():
+    global _chart
+    if _chart is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from gantt_chart import GanttChart
+
+        _chart = GanttChart("", "Day", {}, animated=False)
+        _chart.figure.subplots_adjust(left=0.2, right=0.97)
+        FigureCanvasAgg(_chart.figure)
+    return _chart
+
+
+def category_colors(schedule):
+    return {c: palette[k % len(palette)] for k, c in enumerate(schedule.store.category_names)}
+
+
+def safe_name(text):
+    return re.sub(r"[^\w.-]+", "_", str(text)).strip("_") or "chart"
+
+
+# Draw tasks on the worker's chart and save it; the format follows the extension
+def render_chart(path, title, tasks, critical, colors, dpi=100):
+    chart = _worker_chart()
+    chart.title = title
+    chart.category_colors = colors
+    chart.figure.set_size_inches(14, max(4, 1.5 + 0.3 * len(tasks)))
+    chart.draw(tasks, critical)
+    with span("render.save"):
+        chart.figure.savefig(path, dpi=dpi)
+    return path
+
+
+# One chart for the whole schedule, or one per category
+def render_schedule(schedule, out_dir, stem, title, fmt="png", by_category=False, dpi=100):
+    colors = category_colors(schedule)
+    critical = set(schedule.critical_path())
+    if not by_category:
+        path = os.path.join(out_dir, f"{safe_name(stem)}.{fmt}")
+        return [render_chart(path, title, schedule.tasks(), critical, colors, dpi)]
+    paths = []
+    for category in schedule.store.category_names:
+        path = os.path.join(out_dir, f"{safe_name(stem)}_{safe_name(category)}.{fmt}")
+        paths.append(render_chart(path, f"{title} - {category}", schedule.tasks(category), critical, colors, dpi))
+    return paths
+
+
+def render_fields(template, fields, out_dir, fmt, by_category, dpi):
+    paths = []
+    for field in fields:
+        schedule = plan_field(template, field)
+        paths.extend(render_schedule(schedule, out_dir, field["field_id"], f"Field {field['field_id']}",
+                                     fmt, by_category, dpi))
+    return paths
+
+
+# Render every field's chart(s) across a process pool
+def render_batch(fields, template, out_dir, fmt="png", by_category=False, workers=None, dpi=100):
+    os.makedirs(out_dir, exist_ok=True)
+    chunks = [fields[i:i + chunk_size] for i in range(0, len(fields), chunk_size)]
+    n = len(chunks)
+    paths = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_paths in pool.map(render_fields, [template] * n, chunks, [out_dir] * n, [fmt] * n,
+                                    [by_category] * n, [dpi] * n):
+            paths.extend(chunk_paths)
+    return paths
+
+
+# Render arguments, shared with `gantt_cli.py render`
+def add_arguments(parser):
+    parser.add_argument("fields", nargs="?", help="CSV with field_id, region, start_offset, durations, delays; "
+                                                  "without it the template itself is rendered")
+    parser.add_argument("--template", default="combined", help=templates_help)
+    parser.add_argument("--out", default="gantt_charts", help="output directory")
+    parser.add_argument("--format", choices=formats, default="png")
+    parser.add_argument("--by-category", action="store_true", help="one chart per category instead of per plan")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=100)
+
+
+def run(args):
+    t0 = time.perf_counter()
+    if args.fields:
+        paths = render_batch(read_fields(args.fields), args.template, args.out, args.format, args.by_category,
+                             args.workers, args.dpi)
+    else:
+        os.makedirs(args.out, exist_ok=True)
+        stem = template_stem(args.template)
+        paths = render_schedule(build_template(args.template), args.out, stem, stem, args.format,
+                                args.by_category, args.dpi)
+    print(f"✅ Rendered {len(paths)} chart(s) into {args.out} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render Gantt charts to image files without a display")
+    add_arguments(parser)
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+    run(args)
@@ -0,0 +1,76 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Runs schedule recomputation off the Tk main thread. Requests are debounced
+# per key and only the newest one per key is computed; anything superseded is
+# cancelled before it starts or dropped when it finishes. Results come back
+# through a queue polled from the Tk event loop, since Tk is not thread-safe.
+class ScheduleWorker:
+    def __init__(self, root, debounce_ms=150, poll_ms=30):
+        self.root = root
+        self.debounce_ms = debounce_ms
+        self.poll_ms = poll_ms
+        # A single thread: every job mutates the same Schedule
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.results = queue.Queue()
+        self.generation = {}
+        self.pending = {}
+        self.futures = {}
+        self.poll_id = root.after(poll_ms, self._poll)
+
+    # compute() runs on the worker thread; on_done(result) runs on the Tk thread
+    def submit(self, key, compute, on_done):
+        generation = self.generation.get(key, 0) + 1
+        self.generation[key] = generation
+        if key in self.pending:
+            self.root.after_cancel(self.pending.pop(key))
+        self.pending[key] = self.root.after(self.debounce_ms, self._start, key, generation, compute, on_done)
+
+    # Drop any pending or running request for key, e.g. when its result was
+    # served from a cache instead
+    def cancel(self, key):
+        self.generation[key] = self.generation.get(key, 0) + 1
+        if key in self.pending:
+            self.root.after_cancel(self.pending.pop(key))
+        future = self.futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def _start(self, key, generation, compute, on_done):
+        self.pending.pop(key, None)
+        previous = self.futures.get(key)
+        if previous is not None:
+            previous.cancel()
+        self.futures[key] = self.executor.submit(self._run, key, generation, compute, on_done)
+
+    def _stale(self, key, generation):
+        return self.generation.get(key) != generation
+
+    def _run(self, key, generation, compute, on_done):
+        if self._stale(key, generation):
+            return
+        try:
+            result, error = compute(), None
+        except Exception as exc:
+            result, error = None, exc
+        self.results.put((key, generation, result, error, on_done))
+
+    def _poll(self):
+        while True:
+            try:
+                key, generation, result, error, on_done = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if error is not None:
+                self.root.report_callback_exception(type(error), error, error.__traceback__)
+            elif not self._stale(key, generation):
+                on_done(result)
+        self.poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def shutdown(self):
+        self.root.after_cancel(self.poll_id)
+        for after_id in self.pending.values():
+            self.root.after_cancel(after_id)
+        self.pending.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,427 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+import instrument
+from instrument import count, span
+from scheduler import field_separator
+from task_store import index_dtype
+
+# Append-only history of scheduled seasons. Every recorded run adds one row
+# per task to the "tasks" table (planned against actual or expected dates,
+# delay and its cause) and one row per field to the "fields" table (planned
+# and actual makespan). Each column is a raw binary file read back through
+# np.memmap, and strings (season, region, field, task, category, cause) are
+# stored as ids into one shared dictionary, so queries scan a few int32 and
+# float64 columns chunk by chunk instead of loading the history into memory:
+#   history/strings.json   ["2025", "North", "F12", "Gobar Procurement", ...]
+#   history/meta.json      {"version": 1, "rows": {"tasks": 123456, "fields": 480}}
+#   history/tasks/delay.f8 ...
+# Rows count once meta.json says so: a run interrupted mid-append leaves
+# bytes past the committed length, which the next append cuts off. One
+# writer at a time; any number of readers.
+
+history_version = 1
+
+string_dtype = index_dtype
+
+schema = {
+    "tasks": {
+        "season": string_dtype,
+        "region": string_dtype,
+        "field": string_dtype,
+        "task": string_dtype,
+        "category": string_dtype,
+        "cause": string_dtype,
+        "planned_start": np.float64,
+        "planned_end": np.float64,
+        "start": np.float64,
+        "end": np.float64,
+        "actual_start": np.float64,
+        "duration": np.float64,
+        "delay": np.float64,
+    },
+    "fields": {
+        "season": string_dtype,
+        "region": string_dtype,
+        "field": string_dtype,
+        "tasks": np.int32,
+        "planned_makespan": np.float64,
+        "makespan": np.float64,
+        "recorded": np.float64,
+    },
+}
+
+string_columns = {"season", "region", "field", "task", "category", "cause"}
+
+# Values computed from stored columns while scanning
+derived_columns = {
+    "slip": (("start", "planned_start"), lambda start, planned: start - planned),
+    "overrun": (("end", "planned_end"), lambda end, planned: end - planned),
+    "makespan_slip": (("makespan", "planned_makespan"), lambda actual, planned: actual - planned),
+    # Only the runs that were delayed (NaN, and so skipped, otherwise)
+    "delay_days": (("delay",), lambda delay: np.where(delay > 0, delay, np.nan)),
+}
+
+statistics = ("count", "sum", "mean", "min", "max", "std")
+
+# Rows scanned at once by queries
+chunk_rows = 1 << 20
+
+
+def column_file(path, table, name):
+    return os.path.join(path, table, f"{name}.{np.dtype(schema[table][name]).str[1:]}")
+
+
+def write_json(path, data):
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp, path)
+
+
+class HistoryStore:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.strings = []
+        self.string_ids = {}
+        self.rows = {table: 0 for table in schema}
+        self._columns = {}
+        self.reload()
+
+    # Pick up rows and strings appended since the store was opened
+    def reload(self):
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != history_version:
+                raise ValueError(f"{self.path} holds history version {meta.get('version')}, "
+                                 f"expected {history_version}")
+            self.rows.update(meta["rows"])
+            with open(os.path.join(self.path, "strings.json"), encoding="utf-8") as f:
+                self.strings = json.load(f)
+            self.string_ids = {s: i for i, s in enumerate(self.strings)}
+        self._columns = {}
+
+    def __len__(self):
+        return self.rows["tasks"]
+
+    def intern(self, value):
+        value = str(value)
+        sid = self.string_ids.get(value)
+        if sid is None:
+            sid = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+    # A stored column as a read-only memory map
+    def column(self, table, name):
+        key = (table, name)
+        data = self._columns.get(key)
+        if data is None:
+            dtype, rows = schema[table][name], self.rows[table]
+            if rows:
+                data = np.memmap(column_file(self.path, table, name), dtype=dtype, mode="r", shape=(rows,))
+            else:
+                data = np.zeros(0, dtype=dtype)
+            self._columns[key] = data
+        return data
+
+    # Append rows given as {column: values}; every column of the table is
+    # required and string columns take strings
+    def append(self, table, columns):
+        missing = set(schema[table]) - set(columns)
+        if missing:
+            raise ValueError(f"Missing {table} columns: {', '.join(sorted(missing))}")
+        arrays = {}
+        for name, dtype in schema[table].items():
+            values = columns[name]
+            if name in string_columns:
+                values = [self.intern(v) for v in values]
+            arrays[name] = np.asarray(values, dtype=dtype)
+        rows = {len(a) for a in arrays.values()}
+        if len(rows) != 1:
+            raise ValueError(f"Columns of a {table} append differ in length")
+        added = rows.pop()
+        if not added:
+            return 0
+        with span("history.append"):
+            os.makedirs(os.path.join(self.path, table), exist_ok=True)
+            for name, data in arrays.items():
+                path = column_file(self.path, table, name)
+                committed = self.rows[table] * data.itemsize
+                if os.path.exists(path) and os.path.getsize(path) != committed:
+                    os.truncate(path, committed)
+                with open(path, "ab") as f:
+                    f.write(data.tobytes())
+            # Strings first, so committed rows never refer to unknown ids
+            write_json(os.path.join(self.path, "strings.json"), self.strings)
+            self.rows[table] += added
+            write_json(os.path.join(self.path, "meta.json"), {"version": history_version, "rows": self.rows})
+        self._columns = {key: data for key, data in self._columns.items() if key[0] != table}
+        count("history_rows", added)
+        return added
+
+    # Record one season's run of a plan. `planned` is the schedule as drawn
+    # up; `actual` the same plan after delays and field progress (defaults to
+    # `planned`). Merged multi-field plans are split on their field prefix and
+    # `regions` maps field ids to regions; a single plan is stored under
+    # `field` and `region`. `causes` maps task names to delay causes.
+    def record(self, season, planned, actual=None, causes=None, regions=None, field="plan", region="default"):
+        actual = actual if actual is not None else planned
+        if list(actual.names) != list(planned.names):
+            raise ValueError("Planned and actual schedules hold different tasks")
+        causes, regions = causes or {}, regions or {}
+        fields, tasks = [], []
+        for name in planned.names:
+            prefix, sep, task = name.partition(field_separator)
+            fields.append(prefix if sep else field)
+            tasks.append(task if sep else name)
+        task_regions = [regions.get(f, region) for f in fields]
+        store = actual.store
+        self.append("tasks", {
+            "season": [season] * len(tasks),
+            "region": task_regions,
+            "field": fields,
+            "task": tasks,
+            "category": planned.categories,
+            "cause": [causes.get(t, "None") for t in tasks],
+            "planned_start": planned.start,
+            "planned_end": planned.end,
+            "start": store.start,
+            "end": store.end,
+            "actual_start": store.actual_start,
+            "duration": store.duration,
+            "delay": store.delay,
+        })
+        names, first, keys, sizes = np.unique(np.array(fields, dtype=object), return_index=True,
+                                              return_inverse=True, return_counts=True)
+        keys = keys.reshape(-1)
+        order = np.argsort(first)
+        planned_makespan = np.full(len(names), -np.inf)
+        makespan = np.full(len(names), -np.inf)
+        np.maximum.at(planned_makespan, keys, planned.end)
+        np.maximum.at(makespan, keys, store.end)
+        self.append("fields", {
+            "season": [season] * len(names),
+            "region": [task_regions[i] for i in first[order].tolist()],
+            "field": names[order].tolist(),
+            "tasks": sizes[order],
+            "planned_makespan": planned_makespan[order],
+            "makespan": makespan[order],
+            "recorded": [time.time()] * len(names),
+        })
+        return len(tasks)
+
+    # Row mask for one chunk; `where` maps columns to a value or a list of values
+    def _mask(self, table, where, rows):
+        mask = np.ones(rows.stop - rows.start, dtype=bool)
+        for name, wanted in (where or {}).items():
+            wanted = list(wanted) if isinstance(wanted, (list, tuple, set)) else [wanted]
+            if name in string_columns:
+                wanted = [self.string_ids[str(w)] for w in wanted if str(w) in self.string_ids]
+            else:
+                wanted = [float(w) for w in wanted]
+            mask &= np.isin(self.column(table, name)[rows], wanted)
+        return mask
+
+    def _values(self, table, value, rows):
+        if value in derived_columns:
+            inputs, compute = derived_columns[value]
+            return compute(*(np.asarray(self.column(table, c)[rows], dtype=float) for c in inputs))
+        return np.asarray(self.column(table, value)[rows], dtype=float)
+
+    # Aggregate `value` over the rows matching `where`, grouped by the columns
+    # in `by`: {(group values...): statistic}. NaN values (an actual start not
+    # yet reported) are left out. For example the mean delay of one task
+    # across five seasons, by region:
+    #   store.aggregate("delay", by=["region"], where={"task": "Gobar Procurement",
+    #                                                  "season": ["2021", "2022", "2023", "2024", "2025"]})
+    def aggregate(self, value, by=(), where=None, stat="mean", table="tasks"):
+        return self.summarise(value, by, where, table)[stat]
+
+    # Every statistic at once: {stat: {(group values...): number}}
+    def summarise(self, value, by=(), where=None, table="tasks"):
+        by = list(by)
+        bad = [c for c in by if c not in schema[table] or np.dtype(schema[table][c]).kind not in "iu"]
+        if bad:
+            raise ValueError(f"Cannot group {table} by: {', '.join(bad)}")
+        radix = max(len(self.strings), int(max((self.column(table, c).max(initial=0) for c in by), default=0)) + 1)
+        if by and radix ** len(by) >= 2 ** 62:
+            raise ValueError("Too many grouping columns")
+        totals = {}
+        with span("history.query"):
+            for start in range(0, self.rows[table], chunk_rows):
+                rows = slice(start, min(start + chunk_rows, self.rows[table]))
+                values = self._values(table, value, rows)
+                mask = self._mask(table, where, rows) & ~np.isnan(values)
+                if not mask.any():
+                    continue
+                values = values[mask]
+                key = np.zeros(len(values), dtype=np.int64)
+                for c in by:
+                    key = key * radix + self.column(table, c)[rows][mask]
+                groups, inverse = np.unique(key, return_inverse=True)
+                inverse = inverse.reshape(-1)
+                n = np.bincount(inverse, minlength=len(groups))
+                sums = np.bincount(inverse, values, minlength=len(groups))
+                squares = np.bincount(inverse, values * values, minlength=len(groups))
+                low = np.full(len(groups), np.inf)
+                high = np.full(len(groups), -np.inf)
+                np.minimum.at(low, inverse, values)
+                np.maximum.at(high, inverse, values)
+                for k, n_k, s, q, lo, hi in zip(groups.tolist(), n.tolist(), sums.tolist(), squares.tolist(),
+                                                low.tolist(), high.tolist()):
+                    total = totals.get(k)
+                    if total is None:
+                        totals[k] = [n_k, s, q, lo, hi]
+                    else:
+                        total[0] += n_k
+                        total[1] += s
+                        total[2] += q
+                        total[3] = min(total[3], lo)
+                        total[4] = max(total[4], hi)
+        result = {stat: {} for stat in statistics}
+        for k, (n, s, q, lo, hi) in totals.items():
+            group = self._group(by, table, k, radix)
+            mean = s / n
+            result["count"][group] = n
+            result["sum"][group] = s
+            result["mean"][group] = mean
+            result["min"][group] = lo
+            result["max"][group] = hi
+            result["std"][group] = max(0.0, q / n - mean * mean) ** 0.5
+        return result
+
+    # Decode a packed group key back into its column values
+    def _group(self, by, table, key, radix):
+        values = []
+        for c in reversed(by):
+            key, part = divmod(key, radix)
+            values.append(self.strings[part] if c in string_columns else part)
+        return tuple(reversed(values))
+
+
+# Delay models per cause in delay_risk's (probability, distribution, params)
+# form, fitted from recorded delays: the probability is the share of a
+# cause's task runs that were delayed, and the delays seen set a triangular
+# distribution from the smallest to the largest, with its mode placed so its
+# mean matches theirs. Causes recorded fewer than `min_runs` times are left
+# out, so callers keep their defaults for them.
+def fit_cause_models(store, where=None, min_runs=20):
+    runs = store.aggregate("delay", by=["cause"], where=where, stat="count")
+    delayed = store.summarise("delay_days", by=["cause"], where=where)
+    models = {}
+    for (cause,), n in sorted(runs.items()):
+        if cause == "None" or n < min_runs:
+            continue
+        hits = delayed["count"].get((cause,), 0)
+        if not hits:
+            models[cause] = (0.0, "fixed", (0,))
+            continue
+        low, high, mean = (delayed[stat][(cause,)] for stat in ("min", "max", "mean"))
+        if high - low < 1e-9:
+            models[cause] = (hits / n, "fixed", (low,))
+        else:
+            mode = min(max(3 * mean - low - high, low), high)
+            models[cause] = (hits / n, "triangular", (low, mode, high))
+    return models
+
+
+# Delay causes named by a template: the fifth column of Field-preprep's task
+# list, or a planning workbook's Cause column; bucket templates have none
+def template_causes(template):
+    if template.lower().endswith((".xlsx", ".xlsm")):
+        from workbook_loader import load_rows
+
+        return {row[0]: row[4] for row in load_rows(template)}
+    if template == "field-preprep":
+        from delay_risk import field_preprep_plan
+
+        return field_preprep_plan()[1]
+    return {}
+
+
+# "task=Gobar Procurement; season=2021,2022" -> {"task": ["Gobar Procurement"], "season": ["2021", "2022"]}
+def parse_where(text):
+    where = {}
+    for item in (text or "").split(";"):
+        if item.strip():
+            name, _, values = item.partition("=")
+            where[name.strip()] = [v.strip() for v in values.split(",")]
+    return where
+
+
+def run_record(args):
+    from batch_gantt import read_fields
+    from progress_log import ProgressConsumer, build_plan
+
+    # The fields CSV's delays are what happened, not what was planned
+    planned = build_plan(args.template, args.fields)
+    planned.apply_delays({})
+    actual = build_plan(args.template, args.fields)
+    if args.log:
+        ProgressConsumer(actual, args.log).poll()
+    regions = {f["field_id"]: f["region"] for f in read_fields(args.fields)} if args.fields else None
+    store = HistoryStore(args.history)
+    added = store.record(args.season, planned, actual, template_causes(args.template), regions,
+                         region=args.region)
+    print(f"Recorded {added} task runs for season {args.season}; {len(store)} in {args.history}")
+
+
+def run_query(args):
+    store = HistoryStore(args.history)
+    by = [c.strip() for c in args.by.split(",")] if args.by else []
+    result = store.aggregate(args.value, by, parse_where(args.where), args.stat, args.table)
+    for group, value in sorted(result.items()):
+        print(f"{' / '.join(map(str, group)) or 'all':<50} {value:12.3f}")
+    if not result:
+        print("No matching rows")
+
+
+def run_fit(args):
+    models = fit_cause_models(HistoryStore(args.history), parse_where(args.where), args.min_runs)
+    for cause, (probability, kind, params) in models.items():
+        print(f"{cause:<30} p={probability:.3f}  {kind} {tuple(round(p, 3) for p in params)}")
+
+
+if __name__ == "__main__":
+    from batch_gantt import templates_help
+
+    parser = argparse.ArgumentParser(description="Record schedule history and query it across seasons")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="append a season's plan (and its progress log) to the history")
+    record.add_argument("history", help="history directory")
+    record.add_argument("--season", required=True)
+    record.add_argument("--template", default="combined", help=templates_help)
+    record.add_argument("--fields", help="CSV of fields to merge into one plan")
+    record.add_argument("--log", help="progress log with what actually happened")
+    record.add_argument("--region", default="default", help="region of a template-only plan")
+    record.set_defaults(run=run_record)
+
+    query = commands.add_parser("query", help="aggregate a column over the history")
+    query.add_argument("history")
+    query.add_argument("value", help="column, or slip / overrun / makespan_slip / delay_days")
+    query.add_argument("--by", help="comma-separated columns to group by, e.g. region,season")
+    query.add_argument("--where", help='filters, e.g. "task=Gobar Procurement; season=2021,2022"')
+    query.add_argument("--stat", choices=statistics, default="mean")
+    query.add_argument("--table", choices=tuple(schema), default="tasks")
+    query.set_defaults(run=run_query)
+
+    fit = commands.add_parser("fit", help="fit delay models per cause from the recorded delays")
+    fit.add_argument("history")
+    fit.add_argument("--where", help="restrict to some seasons or regions, e.g. \"region=North\"")
+    fit.add_argument("--min-runs", type=int, default=20, help="fewest task runs a cause needs to be fitted")
+    fit.set_defaults(run=run_fit)
+
+    for command in (record, query, fit):
+        instrument.add_arguments(command)
+    args = parser.parse_args()
+    instrument.configure(args)
+    args.run(args)
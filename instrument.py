@@ -0,0 +1,201 @@
+import atexit
+import cProfile
+import csv
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Timing spans, counters and peak-memory sampling for planning runs. Off by
+# default, when span() hands back a shared no-op context and count() returns
+# at once. Switched on with enable() (the CLIs' --profile flag) or from the
+# environment:
+#   GANTT_PROFILE=summary.json|summary.csv   write a summary at exit (1 for gantt_profile.json)
+#   GANTT_PROFILE_STAGE=<span name>          cProfile that span into <summary>.<span>.prof
+#   GANTT_PROFILE_MEMORY=1                   trace peak Python memory per span (slower)
+enabled = False
+_pid = None
+summary_path = None
+profile_stage = None
+trace_memory = False
+
+# name -> [calls, total seconds, longest call, peak traced bytes]
+spans = {}
+counters = {}
+# Span nesting depth, kept per thread: the Tk thread and worker threads open
+# spans independently and must not see each other's nesting
+_local = threading.local()
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_no_span = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("name", "started", "profiler")
+
+    def __init__(self, name):
+        self.name = name
+        self.profiler = None
+
+    def __enter__(self):
+        depth = getattr(_local, "depth", 0)
+        if trace_memory and depth == 0:
+            tracemalloc.reset_peak()
+        _local.depth = depth + 1
+        if self.name == profile_stage:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        _local.depth -= 1
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(f"{summary_path or 'gantt_profile'}.{self.name}.prof")
+        record = _add(self.name, elapsed)
+        if trace_memory:
+            # Peak within the outermost enclosing span
+            record[3] = max(record[3], tracemalloc.get_traced_memory()[1])
+        return False
+
+
+def _add(name, elapsed):
+    record = spans.get(name)
+    if record is None:
+        record = spans[name] = [0, 0.0, 0.0, 0]
+    record[0] += 1
+    record[1] += elapsed
+    record[2] = max(record[2], elapsed)
+    return record
+
+
+def span(name):
+    return _Span(name) if enabled else _no_span
+
+
+# A duration measured elsewhere, e.g. from process start to the first window,
+# recorded as one call of a span
+def record(name, seconds):
+    if enabled:
+        _add(name, seconds)
+
+
+def count(name, n=1):
+    if enabled:
+        counters[name] = counters.get(name, 0) + n
+
+
+# Decorator form of span() for whole functions
+def timed(name):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable(path=None, stage=None, memory=False):
+    global enabled, _pid, summary_path, profile_stage, trace_memory
+    if path and summary_path is None:
+        atexit.register(_write_at_exit)
+    enabled = True
+    _pid = os.getpid()
+    summary_path = path or summary_path
+    profile_stage = stage
+    trace_memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def reset():
+    spans.clear()
+    counters.clear()
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def summary():
+    return {
+        "spans": {
+            name: {
+                "calls": calls,
+                "total_s": round(total, 6),
+                "mean_s": round(total / calls, 6),
+                "max_s": round(longest, 6),
+                "peak_traced_mb": round(peak / 1e6, 3) if trace_memory else None,
+            }
+            for name, (calls, total, longest, peak) in sorted(spans.items(), key=lambda item: -item[1][1])
+        },
+        "counters": dict(sorted(counters.items())),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# JSON, or CSV with one row per span and per counter, chosen by extension
+def write_summary(path=None):
+    path = path or summary_path
+    if not path:
+        return None
+    data = summary()
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["kind", "name", "calls", "total_s", "mean_s", "max_s", "peak_traced_mb"])
+            for name, s in data["spans"].items():
+                writer.writerow(["span", name, s["calls"], s["total_s"], s["mean_s"], s["max_s"], s["peak_traced_mb"]])
+            for name, value in data["counters"].items():
+                writer.writerow(["counter", name, value, "", "", "", ""])
+            writer.writerow(["memory", "peak_rss_mb", "", "", "", "", data["peak_rss_mb"]])
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    return path
+
+
+# Pool workers inherit the settings but must not overwrite the parent's summary
+def _write_at_exit():
+    if os.getpid() == _pid:
+        write_summary()
+
+
+# --profile flags shared by the command-line tools
+def add_arguments(parser):
+    parser.add_argument("--profile", metavar="SUMMARY", help="record timings and counters into a .json or .csv file")
+    parser.add_argument("--profile-stage", metavar="SPAN", help="also cProfile this span, e.g. export.sheet")
+    parser.add_argument("--profile-memory", action="store_true", help="trace peak Python memory per span")
+
+
+def configure(args):
+    if args.profile or args.profile_stage or args.profile_memory:
+        enable(args.profile, args.profile_stage, args.profile_memory)
+
+
+_from_env = os.environ.get("GANTT_PROFILE", "")
+if _from_env not in ("", "0"):
+    enable("gantt_profile.json" if _from_env == "1" else _from_env, os.environ.get("GANTT_PROFILE_STAGE"),
+           os.environ.get("GANTT_PROFILE_MEMORY", "") not in ("", "0"))
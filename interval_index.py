@@ -0,0 +1,80 @@
+import numpy as np
+
+# Timeline cells [first, last) covered by each [start, end) span, one cell per
+# `step` days; the small epsilon keeps float rounding from adding a cell
+def slot_range(start, end, step=1):
+    start = np.asarray(start, dtype=float)
+    end = np.asarray(end, dtype=float)
+    first = np.floor(start / step + 1e-9).astype(np.int64)
+    last = np.ceil(end / step - 1e-9).astype(np.int64)
+    return first, np.maximum(last, first)
+
+
+# Sorted-array index over task spans [start, end) for "what is active when"
+# questions. Spans are kept sorted by start, with the largest end of every
+# block of `block` consecutive spans, so a query only looks inside blocks that
+# can still be running; counts use the sorted starts and ends alone.
+class IntervalIndex:
+    block = 64
+
+    def __init__(self, start, end):
+        self.start = np.asarray(start, dtype=float)
+        self.end = np.asarray(end, dtype=float)
+        self.by_start = np.argsort(self.start, kind="stable")
+        self.sorted_start = self.start[self.by_start]
+        self.sorted_end = np.sort(self.end)
+        if len(self.start):
+            self.block_end = np.maximum.reduceat(self.end[self.by_start], np.arange(0, len(self.start), self.block))
+        else:
+            self.block_end = np.zeros(0)
+
+    @classmethod
+    def from_schedule(cls, schedule):
+        return cls(schedule.store.start, schedule.store.end)
+
+    # From (name, category, start, end) tuples, as Schedule.tasks() returns them
+    @classmethod
+    def from_tasks(cls, tasks):
+        return cls([t[2] for t in tasks], [t[3] for t in tasks])
+
+    def __len__(self):
+        return len(self.start)
+
+    # Ids of spans overlapping [low, high), in id order. low == high asks for
+    # the spans running at that instant.
+    def overlapping(self, low, high):
+        k = np.searchsorted(self.sorted_start, high, side="right" if high <= low else "left")
+        blocks = np.flatnonzero(self.block_end[:-(-k // self.block)] > low)
+        candidates = (blocks[:, None] * self.block + np.arange(self.block)).ravel()
+        ids = self.by_start[candidates[candidates < k]]
+        return np.sort(ids[self.end[ids] > low])
+
+    def active_at(self, day):
+        return self.overlapping(day, day)
+
+    # Number of spans running at each of the given days
+    def concurrency(self, days):
+        days = np.asarray(days, dtype=float)
+        return np.searchsorted(self.sorted_start, days, side="right") - np.searchsorted(self.sorted_end, days,
+                                                                                          side="right")
+
+    # Weighted number of spans touching each timeline cell, one row per group
+    # (e.g. category ids); weights default to 1 per span. Returns an array of
+    # shape (groups, cells).
+    def load(self, step=1, groups=None, weights=None, cells=None):
+        first, last = slot_range(self.start, self.end, step)
+        cells = int(last.max(initial=0)) if cells is None else cells
+        groups = np.zeros(len(self), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+        weights = np.ones(len(self)) if weights is None else np.asarray(weights, dtype=float)
+        n_groups = int(groups.max(initial=0)) + 1
+        diff = np.zeros((n_groups, cells + 1))
+        np.add.at(diff, (groups, np.clip(first, 0, cells)), weights)
+        np.add.at(diff, (groups, np.clip(last, 0, cells)), -weights)
+        return np.cumsum(diff, axis=1)[:, :cells]
+
+    # Tasks touching each cell, as {category: per-cell counts} in first-seen order
+    def category_load(self, categories, step=1, cells=None):
+        names = list(dict.fromkeys(categories))
+        ids = {c: i for i, c in enumerate(names)}
+        load = self.load(step, [ids[c] for c in categories], cells=cells)
+        return {c: load[i] for i, c in enumerate(names)}
@@ -0,0 +1,280 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+import instrument
+from instrument import timed
+from scheduler import Schedule, field_separator
+
+# Progress events, one JSON object per line of an append-only log:
+#   {"event": "started", "task": "Soil Testing", "day": 3, "field": "F12"}
+#   {"event": "finished", "task": "Soil Testing", "day": 6.5, "field": "F12"}
+#   {"event": "delayed", "task": "Pit Readiness", "days": 2, "field": "F12"}
+# "field" picks the field in a merged multi-field schedule and may be left
+# out for a single plan.
+event_types = ("started", "finished", "delayed")
+
+checkpoint_version = 2
+
+
+def append_event(path, event, task, field=None, day=None, days=None):
+    record = {"event": event, "task": task}
+    if field is not None:
+        record["field"] = field
+    if day is not None:
+        record["day"] = day
+    if days is not None:
+        record["days"] = days
+    record["logged"] = time.time()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+# Identifies the plan a checkpoint was taken from: task names, planned
+# durations and starts and the dependency arrays, since a checkpoint's
+# duration and delay columns only make sense against the same plan
+def plan_digest(schedule):
+    store = schedule.store
+    store.compact()
+    digest = hashlib.sha1()
+    for name in schedule.names:
+        digest.update(name.encode("utf-8"))
+        digest.update(b"\0")
+    for column in (store.duration, np.nan_to_num(store.base_start, nan=-1.0), store.dep_ptr, store.dep_index):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    return digest.hexdigest()
+
+
+# Tails a progress log into a Schedule. New complete lines are read from the
+# last byte offset, applied in batches through Schedule.apply_progress (so only
+# the affected downstream tasks are recomputed) and the actual-progress columns
+# are checkpointed every checkpoint_every events, so a restart resumes from
+# the checkpoint's offset instead of replaying the season.
+class ProgressConsumer:
+    def __init__(self, schedule, log_path, checkpoint_path=None, batch_size=5000, checkpoint_every=50000):
+        self.schedule = schedule
+        self.log_path = log_path
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self.digest = plan_digest(schedule)
+        self.offset = 0
+        self.applied = 0
+        self.skipped = 0
+        self.since_checkpoint = 0
+        if checkpoint_path:
+            self.restore()
+
+    def task_name(self, event):
+        field = event.get("field")
+        return f"{field}{field_separator}{event['task']}" if field is not None else event["task"]
+
+    # Complete lines after the current offset, as (offset after line, event)
+    def read_events(self):
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(self.offset)
+            offset = self.offset
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    event = None
+                yield offset, event
+
+    # (kind, task name, day or days) for a well-formed event on a known task
+    def parse(self, event):
+        try:
+            kind, name = event["event"], self.task_name(event)
+            value = float(event["days"] if kind == "delayed" else event["day"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if kind not in event_types or name not in self.schedule.index:
+            return None
+        return kind, name, value
+
+    # Apply a batch with the same result as applying its events one at a time
+    # in log order. apply_progress takes starts, then delays, then finishes,
+    # and reads the start of a finished task that never reported one before
+    # anything is propagated; so a run of events goes in one call only while
+    # no task repeats in it, and a finish without a start begins a new run.
+    @timed("progress.apply")
+    def apply(self, events):
+        changed = set()
+        started, finished, delayed = {}, {}, {}
+        store = self.schedule.store
+        for event in events:
+            parsed = self.parse(event)
+            if parsed is None:
+                self.skipped += 1
+                continue
+            kind, name, value = parsed
+            pending = started.keys() | finished.keys() | delayed.keys()
+            unstarted = kind == "finished" and np.isnan(store.actual_start[store.index[name]])
+            if name in pending or (pending and unstarted):
+                changed.update(self.schedule.apply_progress(started, finished, delayed))
+                started, finished, delayed = {}, {}, {}
+            if kind == "started":
+                started[name] = value
+            elif kind == "finished":
+                finished[name] = value
+            else:
+                delayed[name] = value
+            self.applied += 1
+        changed.update(self.schedule.apply_progress(started, finished, delayed))
+        return changed
+
+    # Apply everything appended since the last poll; returns moved task names
+    def poll(self):
+        changed = set()
+        batch = []
+        for offset, event in self.read_events():
+            batch.append(event)
+            if len(batch) >= self.batch_size:
+                changed.update(self._flush(batch, offset))
+                batch = []
+        if batch:
+            changed.update(self._flush(batch, offset))
+        return changed
+
+    def _flush(self, batch, offset):
+        changed = self.apply(batch)
+        self.offset = offset
+        self.since_checkpoint += len(batch)
+        if self.checkpoint_path and self.since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+        return changed
+
+    # Follow the log until stop() returns True, calling on_change(names) after
+    # each poll that moved something
+    def follow(self, interval=1.0, on_change=None, stop=None):
+        while not (stop and stop()):
+            changed = self.poll()
+            if changed and on_change:
+                on_change(changed)
+            time.sleep(interval)
+
+    def checkpoint(self):
+        store = self.schedule.store
+        state = {
+            "version": checkpoint_version,
+            "plan": self.digest,
+            "offset": self.offset,
+            "applied": self.applied,
+            "skipped": self.skipped,
+            "actual_start": store.actual_start,
+            "duration": store.duration,
+            "delay": store.delay,
+        }
+        temp = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, self.checkpoint_path)
+        self.since_checkpoint = 0
+
+    # Resume from a checkpoint taken on the same plan; anything else is ignored
+    def restore(self):
+        try:
+            with open(self.checkpoint_path, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+        if state.get("version") != checkpoint_version or state.get("plan") != self.digest:
+            return False
+        store = self.schedule.store
+        store.actual_start = state["actual_start"].copy()
+        store.duration = state["duration"].copy()
+        store.delay = state["delay"].copy()
+        self.schedule.version += 1
+        self.schedule.resolve()
+        self.offset = state["offset"]
+        self.applied = state["applied"]
+        self.skipped = state["skipped"]
+        return True
+
+
+# A workflow template, or one merged schedule for every field in a fields CSV
+def build_plan(template, fields_path=None):
+    from batch_gantt import build_template, plan_field, read_fields
+
+    if not fields_path:
+        return build_template(template)
+    fields = read_fields(fields_path)
+    return Schedule.concat([plan_field(template, field) for field in fields], [f["field_id"] for f in fields])
+
+
+def export(schedule, path):
+    from batch_gantt import palette
+    from gantt_excel import float_cells, write_gantt_workbook
+
+    store = schedule.store
+    actual = [a if a == a else None for a in store.actual_start.tolist()]
+    rows = [
+        (name, category, start, duration, delay, started, end) + flags
+        for (name, category, start, end), duration, delay, started, flags in zip(
+            schedule.tasks(), store.duration.tolist(), store.delay.tolist(), actual, float_cells(schedule))
+    ]
+    colors = {c: palette[k % len(palette)] for k, c in enumerate(store.category_names)}
+    columns = ["Task", "Category", "Start", "Duration", "Delay", "Actual Start", "End", "Total Float", "Critical"]
+    return write_gantt_workbook(path, "Progress", columns, rows, colors, options={"constant_memory": True},
+                                column_widths=[("A:A", 40), ("B:B", 18), ("C:I", 12)], timeline_width=6)
+
+
+if __name__ == "__main__":
+    from batch_gantt import templates_help
+
+    parser = argparse.ArgumentParser(description="Record field progress events or apply them to a plan")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("append", help="append one event to the log")
+    add.add_argument("log")
+    add.add_argument("event", choices=event_types)
+    add.add_argument("task")
+    add.add_argument("--field")
+    add.add_argument("--day", type=float, help="day started or finished")
+    add.add_argument("--days", type=float, help="days of delay")
+
+    consume = commands.add_parser("consume", help="apply the log to a plan")
+    consume.add_argument("log")
+    consume.add_argument("--template", default="combined", help=templates_help)
+    consume.add_argument("--fields", help="CSV of fields to merge into one plan")
+    consume.add_argument("--checkpoint", help="checkpoint file to resume from and update")
+    consume.add_argument("--follow", action="store_true", help="keep tailing the log")
+    consume.add_argument("--interval", type=float, default=1.0)
+    consume.add_argument("--export", help="write the updated plan to this workbook after each change")
+    instrument.add_arguments(consume)
+    args = parser.parse_args()
+
+    if args.command == "append":
+        append_event(args.log, args.event, args.task, args.field, args.day, args.days)
+    else:
+        instrument.configure(args)
+        schedule = build_plan(args.template, args.fields)
+        consumer = ProgressConsumer(schedule, args.log, args.checkpoint)
+
+        def report(changed):
+            print(f"{consumer.applied} events applied ({consumer.skipped} skipped), {len(changed)} tasks moved, "
+                  f"finish day {schedule.makespan:g}")
+            if args.export:
+                export(schedule, args.export)
+
+        if args.follow:
+            try:
+                consumer.follow(args.interval, report)
+            except KeyboardInterrupt:
+                pass
+        else:
+            report(consumer.poll())
+        if args.checkpoint:
+            consumer.checkpoint()
@@ -0,0 +1,166 @@
+import heapq
+import sys
+import time
+
+import numpy as np
+
+from interval_index import IntervalIndex
+from scheduler import Schedule, field_separator
+
+# Units of each shared resource available at any time of day
+resource_capacity = {
+    "lab": 1,
+    "tractor": 1,
+    "labour": 2,
+}
+
+# Units a task holds while it runs, by task name. Fields merged with
+# Schedule.concat look their tasks up by the part after the field prefix.
+task_resources = {
+    # Field-preprep.py
+    "Lab Testing for Residual Nutrients": {"lab": 1},
+    "NPK Measurements": {"lab": 1},
+    "Organic Carbon Titration": {"lab": 1},
+    "Final Compost Testing": {"lab": 1},
+    "Compost Material Collection": {"labour": 1},
+    "Compost Pit Setup": {"labour": 2},
+    "1st Turning": {"labour": 1},
+    "2nd Turning": {"labour": 1},
+    "3rd Turning": {"labour": 1},
+    # gantt_3.py
+    "Crop & Soil Analysis": {"lab": 1},
+    "Soil Testing": {"lab": 1},
+    "Gobar Procurement": {"labour": 1},
+    "Green Manure Collection": {"labour": 1},
+    "Pit Readiness": {"labour": 1},
+    "Compost Mixing": {"labour": 2},
+    "Tractor Preparation": {"tractor": 1},
+    "Rotavator Check": {"tractor": 1},
+    "Field Prep & Compost Application": {"tractor": 1, "labour": 1},
+}
+
+
+def requirements_for(schedule, resources=None):
+    resources = task_resources if resources is None else resources
+    return [resources.get(name.rpartition(field_separator)[2], {}) for name in schedule.names]
+
+
+# Event-driven list scheduling against resource capacities. Tasks become
+# eligible once their dependencies finish, and eligible tasks start in order
+# of their unconstrained start whenever their resources are free. A task that
+# does not fit waits on the resource it is short of and is only reconsidered
+# when that resource is released, so each release touches few waiting tasks.
+# Returns (name, category, start, end) tuples in declaration order.
+def level_schedule(schedule, capacity=None, requirements=None):
+    capacity = resource_capacity if capacity is None else capacity
+    requirements = requirements_for(schedule) if requirements is None else requirements
+    n = len(schedule)
+    for i, needs in enumerate(requirements):
+        for resource, units in needs.items():
+            if units > capacity.get(resource, 0):
+                raise ValueError(f"{schedule.names[i]!r} needs {units} {resource} but capacity is "
+                                 f"{capacity.get(resource, 0)}")
+
+    store = schedule.store
+    priority = list(zip(store.start.tolist(), schedule.position.tolist()))
+    floor = np.nan_to_num(store.base_start).tolist()
+    duration, delay = store.duration.tolist(), store.delay.tolist()
+    dep_ptr, dep_index = store.dep_ptr.tolist(), store.dep_index.tolist()
+    out_ptr, out_index = store.out_ptr.tolist(), store.out_index.tolist()
+    free = dict(capacity)
+    remaining = [dep_ptr[i + 1] - dep_ptr[i] for i in range(n)]
+    start = [None] * n
+    end = [None] * n
+
+    def release_time(i):
+        t = floor[i]
+        for d in dep_index[dep_ptr[i]:dep_ptr[i + 1]]:
+            if end[d] > t:
+                t = end[d]
+        return t + delay[i]
+
+    waiting = [(release_time(i), priority[i], i) for i in range(n) if not remaining[i]]
+    heapq.heapify(waiting)
+    ready = []
+    running = []
+    blocked = {resource: [] for resource in capacity}
+    done = 0
+    now = 0
+
+    while done < n:
+        while waiting and waiting[0][0] <= now:
+            _, p, i = heapq.heappop(waiting)
+            heapq.heappush(ready, (p, i))
+
+        while ready:
+            p, i = heapq.heappop(ready)
+            short = next((r for r, units in requirements[i].items() if units > free[r]), None)
+            if short is not None:
+                heapq.heappush(blocked[short], (p, i))
+                continue
+            for r, units in requirements[i].items():
+                free[r] -= units
+            start[i] = now
+            end[i] = now + duration[i]
+            heapq.heappush(running, (end[i], i))
+
+        candidates = [t for t in (running[0][0] if running else None, waiting[0][0] if waiting else None)
+                      if t is not None]
+        if not candidates:
+            raise ValueError("Resource leveling stalled; check capacities and dependencies")
+        now = max(now, min(candidates))
+
+        released = set()
+        while running and running[0][0] <= now:
+            _, i = heapq.heappop(running)
+            done += 1
+            for r, units in requirements[i].items():
+                free[r] += units
+                released.add(r)
+            for j in out_index[out_ptr[i]:out_ptr[i + 1]]:
+                remaining[j] -= 1
+                if not remaining[j]:
+                    heapq.heappush(waiting, (release_time(j), priority[j], j))
+
+        for r in released:
+            available = free[r]
+            queue = blocked[r]
+            while queue and requirements[queue[0][1]][r] <= available:
+                p, i = heapq.heappop(queue)
+                available -= requirements[i][r]
+                heapq.heappush(ready, (p, i))
+
+    return [
+        (name, category, s, e)
+        for name, category, s, e in zip(schedule.names, schedule.categories, start, end)
+    ]
+
+
+# Units of each resource in use per timeline cell for (name, category, start,
+# end) tasks, e.g. level_schedule() output or Schedule.tasks()
+def resource_usage(tasks, requirements, step=1):
+    index = IntervalIndex.from_tasks(tasks)
+    resources = sorted({r for needs in requirements for r in needs})
+    return {
+        r: index.load(step, weights=[needs.get(r, 0) for needs in requirements])[0]
+        for r in resources
+    }
+
+
+if __name__ == "__main__":
+    from workflows import combined_task_buckets
+
+    fields = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    template = Schedule.from_buckets(combined_task_buckets, numeric_end=True)
+    merged = Schedule.concat([template] * fields, [f"F{k}" for k in range(fields)])
+    t0 = time.perf_counter()
+    leveled = level_schedule(merged)
+    elapsed = time.perf_counter() - t0
+    makespan = max(end for _, _, _, end in leveled)
+    print(f"{fields} fields, {len(merged)} tasks leveled in {elapsed:.2f}s")
+    print(f"Makespan: {merged.makespan:g} days unconstrained, {makespan:g} days with {resource_capacity}")
+    requirements = requirements_for(merged)
+    unconstrained = resource_usage(merged.tasks(), requirements)
+    for resource, used in resource_usage(leveled, requirements).items():
+        print(f"Peak {resource}: {unconstrained[resource].max():g} unconstrained, {used.max():g} leveled "
+              f"(capacity {resource_capacity.get(resource, 0)})")
@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+
+
+# Canonical form of a delay map: zero delays dropped, names sorted, so maps
+# that describe the same scenario share a key whatever order they were built in
+def delay_key(delay_map):
+    return tuple(sorted((name, float(days)) for name, days in delay_map.items() if days))
+
+
+# Bounded LRU cache of scenario results (e.g. Schedule.snapshot()) keyed by
+# the base plan's version and the delay map. Entries for an older plan version
+# are never matched again and age out of the LRU order. Safe to share between
+# the Tk thread and the schedule worker.
+class ScenarioCache:
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, version, delay_map):
+        key = (version, delay_key(delay_map))
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, version, delay_map, result):
+        key = (version, delay_key(delay_map))
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __str__(self):
+        s = self.stats()
+        return (f"{s['hits']} hits, {s['misses']} misses ({s['hit_rate']:.0%} hit rate), "
+                f"{s['size']}/{self.maxsize} cached, {s['evictions']} evicted")
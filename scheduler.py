@@ -0,0 +1,388 @@
+import heapq
+from collections import deque
+
+import numpy as np
+
+from instrument import count, timed
+from task_store import TaskStore, index_dtype
+
+# Separates field and task in the names of merged multi-field schedules
+field_separator = " :: "
+
+
+# Split a bucket entry into (name, dependencies, fixed start, duration).
+# A string or list in the second field names the dependencies; a number is a
+# fixed start day. With numeric_end=True the third field of a fixed-start entry
+# is its end day instead of its duration (the gantt_3.py layout).
+def parse_entry(entry, numeric_end=False):
+    name, dependency, value = entry[0], entry[1], entry[2]
+    if isinstance(dependency, str):
+        return name, [dependency], None, value
+    if isinstance(dependency, (list, tuple)):
+        return name, list(dependency), None, value
+    if numeric_end:
+        return name, [], dependency, value - dependency
+    return name, [], dependency, value
+
+
+# Dependency-graph scheduler shared by the Gantt GUIs and exporters, on top of
+# the columnar TaskStore. A topological order and the store's reverse
+# dependency index let single-task edits recompute only what lies downstream.
+# `version` counts changes to the base plan (tasks, links, durations, fixed
+# starts) so results cached per delay scenario can tell when they are stale.
+class Schedule:
+    def __init__(self, store=None):
+        self.store = store or TaskStore()
+        self.version = 0
+        self.order = np.zeros(0, dtype=index_dtype)
+        self.position = np.zeros(0, dtype=index_dtype)
+        self.ordered = False
+        self.latest_finish = np.zeros(0)
+        self.analyzed = False
+
+    @classmethod
+    def from_buckets(cls, buckets, numeric_end=False):
+        schedule = cls()
+        links = []
+        for category, items in buckets.items():
+            for entry in items:
+                name, deps, fixed_start, duration = parse_entry(entry, numeric_end)
+                schedule.add_task(name, category, duration, fixed_start)
+                links.append((name, deps))
+        for name, deps in links:
+            for dep in deps:
+                schedule.add_dependency(name, dep)
+        schedule.resolve()
+        return schedule
+
+    # Build from exporter rows (name, category, start, duration, ...). Those
+    # tables carry planned start days only, so a task is taken to follow every
+    # task of its own category that finishes exactly when it starts. A task
+    # with no such predecessor opens a phase and follows the previous phase:
+    # of the tasks listed above it that finish exactly when it starts, those
+    # of the category listed nearest. Other categories, such as a parallel
+    # branch that happens to share the boundary day, are not linked. The
+    # planned start stays a floor either way.
+    @classmethod
+    def from_rows(cls, rows):
+        schedule = cls()
+        finishing = {}
+        for k, row in enumerate(rows):
+            name, category, start, duration = row[:4]
+            schedule.add_task(name, category, duration, start)
+            finishing.setdefault(round(start + duration, 6), []).append((k, name, category))
+        for k, row in enumerate(rows):
+            name, category = row[:2]
+            meeting = finishing.get(round(row[2], 6), [])
+            deps = [dep for _, dep, other in meeting if other == category and dep != name]
+            if not deps:
+                before = [(j, dep, other) for j, dep, other in meeting if other != category and j < k]
+                if before:
+                    previous = max(before)[2]
+                    deps = [dep for _, dep, other in before if other == previous]
+            for dep in deps:
+                schedule.add_dependency(name, dep)
+        schedule.resolve()
+        return schedule
+
+    # Merge per-field schedules into one graph; task names become
+    # "<field><field_separator><task>" so fields can share resources
+    @classmethod
+    def concat(cls, schedules, prefixes):
+        stores = []
+        for schedule in schedules:
+            schedule.store.compact()
+            stores.append(schedule.store)
+        merged = cls(TaskStore.concat(stores, prefixes, field_separator))
+        merged.resolve()
+        return merged
+
+    def __len__(self):
+        return len(self.store)
+
+    # Column views onto the store
+    @property
+    def names(self):
+        return self.store.names
+
+    @property
+    def index(self):
+        return self.store.index
+
+    @property
+    def categories(self):
+        return self.store.category_column()
+
+    @property
+    def base_start(self):
+        return self.store.base_start
+
+    @property
+    def duration(self):
+        return self.store.duration
+
+    @property
+    def delay(self):
+        return self.store.delay
+
+    @property
+    def start(self):
+        return self.store.start
+
+    @property
+    def end(self):
+        return self.store.end
+
+    def deps(self, i):
+        return self.store.deps(i)
+
+    def dependents(self, i):
+        return self.store.dependents(i)
+
+    def add_task(self, name, category, duration, fixed_start=None):
+        if name in self.store.index:
+            raise ValueError(f"Duplicate task name: {name!r}")
+        self.store.add(name, category, duration, fixed_start)
+        self.ordered = False
+        self.version += 1
+
+    def add_dependency(self, name, dependency):
+        index = self.store.index
+        if dependency not in index:
+            raise ValueError(f"Unknown dependency {dependency!r} for task {name!r}")
+        self.store.link(index[name], index[dependency])
+        self.ordered = False
+        self.version += 1
+
+    # Kahn's algorithm; ties keep declaration order
+    def topological_order(self):
+        store = self.store
+        store.compact()
+        remaining = np.diff(store.dep_ptr).tolist()
+        ptr, dependents = store.out_ptr.tolist(), store.out_index.tolist()
+        queue = deque(i for i, count in enumerate(remaining) if count == 0)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for j in dependents[ptr[i]:ptr[i + 1]]:
+                remaining[j] -= 1
+                if remaining[j] == 0:
+                    queue.append(j)
+        if len(order) != len(store):
+            cyclic = [store.names[i] for i, count in enumerate(remaining) if count]
+            raise ValueError(f"Dependency cycle between tasks: {cyclic}")
+        return order
+
+    # Full rebuild; only needed after the graph itself changes. The forward
+    # pass runs over plain lists pulled from the store and is written back once.
+    @timed("schedule.resolve")
+    def resolve(self):
+        store = self.store
+        order = self.topological_order()
+        n = len(order)
+        self.order = np.array(order, dtype=index_dtype)
+        self.position = np.empty(n, dtype=index_dtype)
+        self.position[self.order] = np.arange(n, dtype=index_dtype)
+
+        floor = np.nan_to_num(store.base_start).tolist()
+        duration, delay = store.duration.tolist(), store.delay.tolist()
+        actual = store.actual_start.tolist()
+        ptr, deps = store.dep_ptr.tolist(), store.dep_index.tolist()
+        start, end = [0.0] * n, [0.0] * n
+        for i in order:
+            s = actual[i]
+            if s != s:
+                s = floor[i]
+                for d in deps[ptr[i]:ptr[i + 1]]:
+                    if end[d] > s:
+                        s = end[d]
+                s += delay[i]
+            start[i] = s
+            end[i] = s + duration[i]
+        store.start = np.array(start)
+        store.end = np.array(end)
+        count("tasks_scheduled", n)
+        self.ordered = True
+        self.analyzed = False
+        return self.tasks()
+
+    # Recompute the seeds and whatever their end-day changes reach, in
+    # topological order. Returns the names of tasks whose timing moved.
+    @timed("schedule.propagate")
+    def _propagate(self, seeds):
+        store = self.store
+        if not self.ordered:
+            before_start, before_end = store.start.copy(), store.end.copy()
+            self.resolve()
+            n = len(before_start)
+            moved = (store.start[:n] != before_start) | (store.end[:n] != before_end)
+            return [store.names[i] for i in np.flatnonzero(moved).tolist()]
+
+        # Memoryviews give plain-float element access, much cheaper than
+        # indexing the arrays one element at a time
+        self.analyzed = False
+        position = memoryview(self.position)
+        base, duration, delay = memoryview(store.base_start), memoryview(store.duration), memoryview(store.delay)
+        actual = memoryview(store.actual_start)
+        start, end = memoryview(store.start), memoryview(store.end)
+        dep_ptr, dep_index = memoryview(store.dep_ptr), memoryview(store.dep_index)
+        out_ptr, out_index = memoryview(store.out_ptr), memoryview(store.out_index)
+        heap = [(position[i], i) for i in set(seeds)]
+        heapq.heapify(heap)
+        queued = {i for _, i in heap}
+        changed = []
+        while heap:
+            _, i = heapq.heappop(heap)
+            new_start = actual[i]
+            if new_start != new_start:
+                new_start = base[i]
+                if new_start != new_start:
+                    new_start = 0.0
+                for d in dep_index[dep_ptr[i]:dep_ptr[i + 1]]:
+                    if end[d] > new_start:
+                        new_start = end[d]
+                new_start += delay[i]
+            new_end = new_start + duration[i]
+            if new_start != start[i] or new_end != end[i]:
+                changed.append(i)
+                start[i] = new_start
+            if new_end != end[i]:
+                end[i] = new_end
+                for j in out_index[out_ptr[i]:out_ptr[i + 1]]:
+                    if j not in queued:
+                        queued.add(j)
+                        heapq.heappush(heap, (position[j], j))
+        count("tasks_recomputed", len(queued))
+        return [store.names[i] for i in changed]
+
+    def set_delay(self, name, days):
+        self.store.compact()
+        i = self.store.index[name]
+        self.store.delay[i] = days
+        return self._propagate([i])
+
+    def set_duration(self, name, days):
+        self.store.compact()
+        i = self.store.index[name]
+        self.store.duration[i] = days
+        self.version += 1
+        return self._propagate([i])
+
+    # Replace the active delay scenario: tasks missing from delay_map go back
+    # to zero delay, and everything is propagated in a single pass.
+    def apply_delays(self, delay_map):
+        store = self.store
+        store.compact()
+        delay = np.zeros(len(store))
+        delay[[store.index[name] for name in delay_map]] = list(delay_map.values())
+        seeds = np.flatnonzero(delay != store.delay).tolist()
+        store.delay = delay
+        return self._propagate(seeds)
+
+    # Record what happened in the field and propagate it in one pass. An actual
+    # start pins a task's start whatever its dependencies do; a finish fixes
+    # its duration (pinning the start at its current value if none was
+    # reported); a delay on a task that has started lengthens it, otherwise it
+    # adds to the wait before it starts. Returns the names of tasks that moved.
+    def apply_progress(self, started=None, finished=None, delayed=None):
+        store = self.store
+        store.compact()
+        index, actual = store.index, store.actual_start
+        seeds = []
+        for name, day in (started or {}).items():
+            i = index[name]
+            actual[i] = day
+            seeds.append(i)
+        for name, days in (delayed or {}).items():
+            i = index[name]
+            if np.isnan(actual[i]):
+                store.delay[i] += days
+            else:
+                store.duration[i] += days
+            seeds.append(i)
+        for name, day in (finished or {}).items():
+            i = index[name]
+            if np.isnan(actual[i]):
+                actual[i] = store.start[i]
+            store.duration[i] = max(0.0, day - actual[i])
+            seeds.append(i)
+        if seeds:
+            self.version += 1
+        return self._propagate(seeds)
+
+    # Move every fixed start (and so the whole plan) by the given number of days
+    def shift(self, days):
+        store = self.store
+        store.compact()
+        store.base_start = store.base_start + days
+        self.version += 1
+        return self._propagate(np.flatnonzero(~np.isnan(store.base_start)).tolist())
+
+    @property
+    def makespan(self):
+        return float(self.store.end.max()) if len(self.store.end) else 0
+
+    # Backward pass in reverse topological order; start/end already hold the
+    # forward pass. A task's delay sits between its dependencies finishing and
+    # its own start, so it is taken off the latest finish of what precedes it.
+    # Tasks that have actually started no longer constrain their dependencies.
+    @timed("schedule.analyze")
+    def analyze(self):
+        if not self.ordered:
+            self.resolve()
+        store = self.store
+        duration, delay = store.duration.tolist(), store.delay.tolist()
+        started = np.isfinite(store.actual_start).tolist()
+        ptr, deps = store.dep_ptr.tolist(), store.dep_index.tolist()
+        latest = [self.makespan] * len(store)
+        for i in reversed(self.order.tolist()):
+            if started[i]:
+                continue
+            latest_start = latest[i] - duration[i] - delay[i]
+            for d in deps[ptr[i]:ptr[i + 1]]:
+                if latest_start < latest[d]:
+                    latest[d] = latest_start
+        self.latest_finish = np.array(latest)
+        self.analyzed = True
+
+    def _analysis(self):
+        if not self.analyzed:
+            self.analyze()
+        return self.latest_finish
+
+    def latest_start(self, name):
+        i = self.store.index[name]
+        return float(self._analysis()[i] - self.store.duration[i])
+
+    # Days a task can slip without moving the plan's finish
+    def total_float(self, name):
+        i = self.store.index[name]
+        return float(self._analysis()[i] - self.store.end[i])
+
+    def is_critical(self, name, tolerance=1e-9):
+        return self.total_float(name) <= tolerance
+
+    def floats(self):
+        return (self._analysis() - self.store.end).tolist()
+
+    # Everything a view needs after an edit: tasks, critical names and finish day
+    def snapshot(self):
+        return self.tasks(), set(self.critical_path()), self.makespan
+
+    # Zero-float tasks in topological order
+    def critical_path(self, tolerance=1e-9):
+        critical = self._analysis() - self.store.end <= tolerance
+        order = self.order[critical[self.order]]
+        return [self.store.names[i] for i in order.tolist()]
+
+    # Flat (name, category, start, end) tuples in declaration order
+    def tasks(self, category=None):
+        store = self.store
+        if category is None:
+            rows = range(len(store))
+        else:
+            rows = np.flatnonzero(store.category == store.category_ids.get(category, -1)).tolist()
+        names, category_names = store.names, store.category_names
+        category_ids, start, end = store.category.tolist(), store.start.tolist(), store.end.tolist()
+        return [(names[i], category_names[category_ids[i]], start[i], end[i]) for i in rows]
@@ -0,0 +1,148 @@
+import numpy as np
+
+index_dtype = np.int32
+
+
+# Compressed sparse rows for the edges target -> source: the sources of
+# target i are index[ptr[i]:ptr[i + 1]], in the order the edges were given
+def csr(n, targets, sources):
+    targets = np.asarray(targets, dtype=index_dtype)
+    sources = np.asarray(sources, dtype=index_dtype)
+    ptr = np.zeros(n + 1, dtype=index_dtype)
+    np.cumsum(np.bincount(targets, minlength=n), out=ptr[1:])
+    order = np.argsort(targets, kind="stable")
+    return ptr, sources[order]
+
+
+# The (target, source) edge arrays behind a CSR pair
+def csr_edges(ptr, index):
+    return np.repeat(np.arange(len(ptr) - 1, dtype=index_dtype), np.diff(ptr)), index
+
+
+# Columnar task table behind Schedule. A task is its row id: names and
+# categories are interned (category holds ids into category_names), timing
+# lives in float64 arrays and dependencies in CSR form. base_start is NaN for
+# tasks that only follow their dependencies, and actual_start is NaN until a
+# task is reported as started. dep_ptr/dep_index list what each
+# task waits on and out_ptr/out_index the same edges the other way round.
+#
+# Tasks and links are staged in small Python lists as they are added and
+# folded into the arrays by compact(), so building stays append-only.
+class TaskStore:
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.category_names = []
+        self.category_ids = {}
+        self.category = np.zeros(0, dtype=index_dtype)
+        self.base_start = np.zeros(0)
+        self.duration = np.zeros(0)
+        self.delay = np.zeros(0)
+        self.actual_start = np.zeros(0)
+        self.start = np.zeros(0)
+        self.end = np.zeros(0)
+        self.dep_ptr = np.zeros(1, dtype=index_dtype)
+        self.dep_index = np.zeros(0, dtype=index_dtype)
+        self.out_ptr = self.dep_ptr
+        self.out_index = self.dep_index
+        self._staged = ([], [], [], [])
+        self._links = ([], [])
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern_category(self, category):
+        cid = self.category_ids.get(category)
+        if cid is None:
+            cid = self.category_ids[category] = len(self.category_names)
+            self.category_names.append(category)
+        return cid
+
+    def add(self, name, category, duration, base_start=None, delay=0):
+        i = self.index[name] = len(self.names)
+        self.names.append(name)
+        category_column, base_column, duration_column, delay_column = self._staged
+        category_column.append(self.intern_category(category))
+        base_column.append(np.nan if base_start is None else base_start)
+        duration_column.append(duration)
+        delay_column.append(delay)
+        return i
+
+    def link(self, task, dependency):
+        self._links[0].append(task)
+        self._links[1].append(dependency)
+
+    @property
+    def pending(self):
+        return bool(self._staged[0] or self._links[0])
+
+    # Fold staged tasks and links into the arrays
+    def compact(self):
+        if not self.pending:
+            return
+        if self._staged[0]:
+            category, base_start, duration, delay = self._staged
+            self.category = np.concatenate([self.category, np.array(category, dtype=index_dtype)])
+            self.base_start = np.concatenate([self.base_start, np.array(base_start, dtype=float)])
+            self.duration = np.concatenate([self.duration, np.array(duration, dtype=float)])
+            self.delay = np.concatenate([self.delay, np.array(delay, dtype=float)])
+            self.actual_start = np.concatenate([self.actual_start, np.full(len(category), np.nan)])
+            self.start = np.concatenate([self.start, np.zeros(len(category))])
+            self.end = np.concatenate([self.end, np.zeros(len(category))])
+            self.dep_ptr = np.concatenate([self.dep_ptr, np.full(len(category), self.dep_ptr[-1], index_dtype)])
+        targets, sources = csr_edges(self.dep_ptr, self.dep_index)
+        if self._links[0]:
+            new_targets, new_sources = self._links
+            targets = np.concatenate([targets, np.array(new_targets, dtype=index_dtype)])
+            sources = np.concatenate([sources, np.array(new_sources, dtype=index_dtype)])
+        self.set_edges(targets, sources)
+        self._staged = ([], [], [], [])
+        self._links = ([], [])
+
+    def set_edges(self, targets, sources):
+        n = len(self.names)
+        self.dep_ptr, self.dep_index = csr(n, targets, sources)
+        self.out_ptr, self.out_index = csr(n, sources, targets)
+
+    def deps(self, i):
+        return self.dep_index[self.dep_ptr[i]:self.dep_ptr[i + 1]]
+
+    def dependents(self, i):
+        return self.out_index[self.out_ptr[i]:self.out_ptr[i + 1]]
+
+    # Category name of every task, in row order
+    def category_column(self):
+        names = self.category_names
+        return [names[c] for c in self.category.tolist()]
+
+    # Bytes held by the arrays (the interned string tables are not counted)
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.category, self.base_start, self.duration, self.delay, self.actual_start,
+                                      self.start, self.end, self.dep_ptr, self.dep_index, self.out_ptr,
+                                      self.out_index))
+
+    # Stack compacted stores into one; task names become "<prefix><separator><name>"
+    @classmethod
+    def concat(cls, stores, prefixes, separator):
+        merged = cls()
+        stores = list(stores)[:len(prefixes)]
+        categories, targets, sources = [], [], []
+        offset = 0
+        for prefix, store in zip(prefixes, stores):
+            merged.names.extend(f"{prefix}{separator}{name}" for name in store.names)
+            remap = np.array([merged.intern_category(c) for c in store.category_names], dtype=index_dtype)
+            categories.append(remap[store.category])
+            store_targets, store_sources = csr_edges(store.dep_ptr, store.dep_index)
+            targets.append(store_targets + offset)
+            sources.append(store_sources + offset)
+            offset += len(store)
+        merged.index = {name: i for i, name in enumerate(merged.names)}
+        if len(merged.index) != len(merged.names):
+            raise ValueError("Duplicate task names in merged schedule; check the field prefixes")
+        if stores:
+            merged.category = np.concatenate(categories)
+            for column in ("base_start", "duration", "delay", "actual_start", "start", "end"):
+                setattr(merged, column, np.concatenate([getattr(store, column) for store in stores]))
+            merged.set_edges(np.concatenate(targets), np.concatenate(sources))
+        return merged
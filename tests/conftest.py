@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Repository root: the modules under test and the shipped planning workbooks
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
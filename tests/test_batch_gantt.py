@@ -0,0 +1,34 @@
+import zipfile
+
+import pytest
+
+import batch_gantt
+from batch_gantt import build_template, plan_field, run_combined, schedule_fields, write_rows
+
+
+def field(field_id, **values):
+    return {"field_id": field_id, "region": "default", "start_offset": 0, "durations": {}, "delays": {}, **values}
+
+
+def test_fields_do_not_share_the_cached_template():
+    delayed = plan_field("seed", field("F1", start_offset=3, delays={"Vendor Approval": 2}))
+    plain = plan_field("seed", field("F2"))
+    template = build_template("seed")
+    assert delayed.makespan == template.makespan + 5
+    assert plain.makespan == template.makespan
+    assert plain.delay.sum() == 0
+
+
+def test_unknown_task_names_the_field():
+    with pytest.raises(ValueError, match=r"delays of field 'F7': 'Vendor Aproval'"):
+        plan_field("seed", field("F7", delays={"Vendor Aproval": 2}))
+
+
+def test_streamed_combined_workbook_matches_one_written_from_all_rows(tmp_path, monkeypatch):
+    fields = [field(f"F{i}", start_offset=i % 4, delays={"Vendor Approval": i % 3}) for i in range(7)]
+    monkeypatch.setattr(batch_gantt, "chunk_size", 2)
+    streamed, whole = tmp_path / "streamed.xlsx", tmp_path / "whole.xlsx"
+    run_combined(fields, "seed", str(streamed), workers=2)
+    write_rows(str(whole), schedule_fields("seed", fields))
+    sheet = "xl/worksheets/sheet1.xml"
+    assert zipfile.ZipFile(streamed).read(sheet) == zipfile.ZipFile(whole).read(sheet)
@@ -0,0 +1,38 @@
+import copy
+
+import numpy as np
+
+import delay_risk
+from delay_risk import build_plan, field_preprep_plan, sample_delays, simulate, simulate_block
+
+
+# Each scenario column of the vectorized pass against the scheduler itself
+def test_block_makespans_match_the_scheduler():
+    schedule, causes = field_preprep_plan()
+    plan = build_plan(schedule, causes)
+    seed = np.random.SeedSequence(11)
+    makespans, _ = simulate_block(plan, 40, seed)
+    delays = sample_delays(plan, 40, np.random.default_rng(seed))
+    names = [schedule.names[i] for i in schedule.order.tolist()]
+    for k in range(40):
+        probe = copy.deepcopy(schedule)
+        probe.apply_delays(dict(zip(names, delays[:, k].tolist())))
+        assert np.isclose(makespans[k], probe.makespan)
+
+
+def test_no_delays_reproduce_the_plan():
+    schedule, causes = field_preprep_plan()
+    never = {cause: (0.0, "fixed", (0,)) for cause in causes.values()}
+    result = simulate(schedule, causes, 200, seed=1, models=never, percentiles=(50, 90, 100))
+    assert set(result["percentiles"].values()) == {schedule.makespan}
+    frequency = result["critical_frequency"]
+    assert {name for name, f in frequency.items() if f == 1} == set(schedule.critical_path())
+
+
+def test_results_do_not_depend_on_the_worker_count(monkeypatch):
+    monkeypatch.setattr(delay_risk, "max_block_cells", 41 * 250)
+    schedule, causes = field_preprep_plan()
+    serial = simulate(schedule, causes, 1000, workers=1, seed=4)
+    pooled = simulate(schedule, causes, 1000, workers=2, seed=4)
+    assert serial == pooled
+    assert serial["percentiles"][90] > serial["planned_makespan"]
@@ -0,0 +1,38 @@
+import os
+import runpy
+
+from conftest import root
+from gantt_excel import float_cells
+from scheduler import Schedule
+
+
+def exported_floats(script):
+    tasks = runpy.run_path(os.path.join(root, script))["tasks"]
+    return {task[0]: flags for task, flags in zip(tasks, float_cells(Schedule.from_rows(tasks)))}
+
+
+# Sampling and labeling both feed drying, which heads the one chain through
+# every lab phase to the report; sieving and packing finish 5 days early
+def test_soil_export_floats_follow_the_critical_path():
+    floats = exported_floats("soil_testing.py")
+    assert floats.pop("Sample Sieving") == (5.0, "")
+    assert floats.pop("Sample Packing") == (5.0, "")
+    assert set(floats.values()) == {(0.0, "Yes")}
+
+
+# Each phase hands off to the next, so the seed plan is one critical chain
+def test_seed_export_is_critical_end_to_end():
+    assert set(exported_floats("GANTT_FINALL.py").values()) == {(0.0, "Yes")}
+
+
+# The planned waits between compost turnings are fixed start days, so only
+# the final compost test and sign-off are critical. The crop-history start
+# can slip as far as the seed branch allows, which ends 11 days before the
+# finish; the compost branch, handing off on the same day 15 as the seed
+# order, is not linked to it.
+def test_field_preprep_export_floats():
+    floats = exported_floats("Field-preprep.py")
+    assert {name for name, (_, critical) in floats.items() if critical} == {"Final Compost Testing", "Compost Ready to Use"}
+    assert floats["Identify Preceding Crop"] == (11.0, "")
+    assert floats["Store Seeds Properly"] == (11.0, "")
+    assert floats["Initial Covering"] == (14.5, "")
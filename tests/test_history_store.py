@@ -0,0 +1,92 @@
+import argparse
+import os
+
+import numpy as np
+import pytest
+
+import history_store
+from history_store import HistoryStore, column_file, fit_cause_models, run_record
+
+
+def task_rows(rng, n, season):
+    start = rng.integers(0, 50, n).astype(float)
+    delay = np.where(rng.random(n) < 0.3, rng.integers(1, 5, n), 0).astype(float)
+    return {
+        "season": [season] * n,
+        "region": rng.choice(["North", "South", "East"], n).tolist(),
+        "field": [f"F{k % 9}" for k in range(n)],
+        "task": rng.choice(["Soil Testing", "Gobar Procurement", "Pit Readiness"], n).tolist(),
+        "category": ["Compost"] * n,
+        "cause": rng.choice(["Lab backlog", "Labor shortage", "None"], n).tolist(),
+        "planned_start": start,
+        "planned_end": start + 2,
+        "start": start + delay,
+        "end": start + delay + 2,
+        "actual_start": np.where(rng.random(n) < 0.5, start + delay, np.nan),
+        "duration": np.full(n, 2.0),
+        "delay": delay,
+    }
+
+
+# Small chunks so every query merges partial results across chunks
+def test_grouped_statistics_match_numpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, "chunk_rows", 7)
+    rng = np.random.default_rng(0)
+    seasons = {season: task_rows(rng, 60, season) for season in ("2024", "2025")}
+    store = HistoryStore(str(tmp_path))
+    for rows in seasons.values():
+        store.append("tasks", rows)
+    reopened = HistoryStore(str(tmp_path))
+    assert len(reopened) == 120
+    result = reopened.summarise("slip", by=["season", "region"], where={"task": ["Soil Testing", "Pit Readiness"]})
+    for season, rows in seasons.items():
+        for region in ("North", "South", "East"):
+            mask = (np.array(rows["region"]) == region) & np.isin(rows["task"], ["Soil Testing", "Pit Readiness"])
+            slip = (rows["start"] - rows["planned_start"])[mask]
+            key = (season, region)
+            assert result["count"][key] == len(slip)
+            assert result["mean"][key] == pytest.approx(slip.mean())
+            assert result["std"][key] == pytest.approx(slip.std())
+            assert result["max"][key] == slip.max()
+    started = reopened.aggregate("actual_start", stat="count")[()]
+    assert started == sum(int(np.isfinite(rows["actual_start"]).sum()) for rows in seasons.values())
+
+
+def test_an_interrupted_append_is_cut_off(tmp_path):
+    rng = np.random.default_rng(1)
+    store = HistoryStore(str(tmp_path))
+    store.append("tasks", task_rows(rng, 10, "2024"))
+    with open(column_file(str(tmp_path), "tasks", "delay"), "ab") as f:
+        f.write(b"\xff" * 24)
+    store = HistoryStore(str(tmp_path))
+    assert len(store) == 10
+    rows = task_rows(rng, 5, "2025")
+    store.append("tasks", rows)
+    assert os.path.getsize(column_file(str(tmp_path), "tasks", "delay")) == 15 * 8
+    assert HistoryStore(str(tmp_path)).column("tasks", "delay")[10:].tolist() == rows["delay"].tolist()
+
+
+def test_fitted_models_follow_the_recorded_delays(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    delays = [0.0] * 30 + [1.0, 2.0, 3.0, 2.0] * 5
+    n = len(delays)
+    rows = task_rows(np.random.default_rng(2), n, "2025")
+    rows.update(cause=["Lab backlog"] * n, delay=np.array(delays))
+    store.append("tasks", rows)
+    probability, kind, (low, mode, high) = fit_cause_models(store)["Lab backlog"]
+    assert probability == 20 / 50 and kind == "triangular"
+    assert (low, high) == (1.0, 3.0)
+    assert (low + mode + high) / 3 == pytest.approx(2.0)
+
+
+def test_recorded_field_delays_show_as_slip(tmp_path):
+    fields = tmp_path / "fields.csv"
+    fields.write_text("field_id,region,start_offset,durations,delays\n"
+                      "F1,North,0,,Vendor Approval=2\nF2,South,1,,\n", encoding="utf-8")
+    args = argparse.Namespace(history=str(tmp_path / "history"), season="2025", template="seed",
+                              fields=str(fields), log=None, region="default")
+    run_record(args)
+    store = HistoryStore(args.history)
+    slip = store.aggregate("slip", by=["field"], where={"task": "Storage Planning"})
+    assert slip == {("F1",): 2.0, ("F2",): 0.0}
+    assert store.aggregate("makespan_slip", by=["field"], table="fields") == {("F1",): 2.0, ("F2",): 0.0}
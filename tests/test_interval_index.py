@@ -0,0 +1,45 @@
+import numpy as np
+
+from interval_index import IntervalIndex, slot_range
+
+
+def spans(n=700, seed=0):
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, 400, n) / 2
+    end = start + rng.choice([0, 0.5, 1, 3, 20, 90], n)
+    return start, end
+
+
+def test_queries_match_brute_force():
+    start, end = spans()
+    index = IntervalIndex(start, end)
+    for low, high in [(0, 0), (10, 10), (10.25, 12), (55, 80.5), (199.5, 199.5), (0, 500), (300, 301)]:
+        if high > low:
+            expected = np.flatnonzero((start < high) & (end > low))
+        else:
+            expected = np.flatnonzero((start <= low) & (end > low))
+        assert np.array_equal(index.overlapping(low, high), expected)
+        assert np.array_equal(index.active_at(low), np.flatnonzero((start <= low) & (end > low)))
+    days = np.arange(0, 300, 0.25)
+    brute = [int(np.count_nonzero((start <= d) & (end > d))) for d in days]
+    assert index.concurrency(days).tolist() == brute
+
+
+def test_load_matches_brute_force():
+    start, end = spans(300, seed=3)
+    groups = np.arange(300) % 4
+    weights = np.arange(300) % 3 + 1
+    index = IntervalIndex(start, end)
+    for step in (0.5, 1, 7):
+        load = index.load(step, groups, weights)
+        first, last = slot_range(start, end, step)
+        brute = np.zeros_like(load)
+        for g, w, a, b in zip(groups, weights, first, last):
+            brute[g, a:b] += w
+        assert np.array_equal(load, brute)
+
+
+def test_empty_index():
+    index = IntervalIndex([], [])
+    assert len(index.active_at(3)) == 0
+    assert index.load().shape == (1, 0)
@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+
+from progress_log import ProgressConsumer
+from scheduler import Schedule
+from workflows import task_buckets
+
+
+def write_log(path, events):
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def replay(log, batch_size):
+    schedule = Schedule.from_buckets(task_buckets)
+    ProgressConsumer(schedule, log, batch_size=batch_size).poll()
+    return schedule
+
+
+def test_replay_does_not_depend_on_batch_size(tmp_path):
+    schedule = Schedule.from_buckets(task_buckets)
+    order = [schedule.names[i] for i in schedule.order.tolist()]
+    rng = np.random.default_rng(7)
+    events = []
+    for name in order[:12]:
+        # Delays before and after the start, and finishes with and without a
+        # reported start, each in the order a field team would log them
+        events.append({"event": "delayed", "task": name, "days": float(rng.integers(1, 3))})
+        if rng.random() < 0.5:
+            events.append({"event": "started", "task": name, "day": float(rng.integers(0, 20))})
+            events.append({"event": "delayed", "task": name, "days": 1})
+        events.append({"event": "finished", "task": name, "day": float(rng.integers(20, 40))})
+    log = tmp_path / "progress.jsonl"
+    write_log(log, events)
+
+    results = [replay(log, size) for size in (1, 2, 3, 10, len(events))]
+    one_by_one = results[0]
+    for schedule in results[1:]:
+        assert schedule.makespan == one_by_one.makespan
+        np.testing.assert_array_equal(schedule.start, one_by_one.start)
+        np.testing.assert_array_equal(schedule.end, one_by_one.end)
+
+
+def test_delay_after_start_lengthens_the_task(tmp_path):
+    log = tmp_path / "progress.jsonl"
+    name = Schedule.from_buckets(task_buckets).names[0]
+    write_log(log, [{"event": "delayed", "task": name, "days": 2},
+                    {"event": "started", "task": name, "day": 5},
+                    {"event": "delayed", "task": name, "days": 1}])
+    for size in (1, 3):
+        schedule = replay(log, size)
+        i = schedule.index[name]
+        assert schedule.delay[i] == 2
+        assert schedule.start[i] == 5
+
+
+def test_checkpoint_from_a_changed_plan_is_not_restored(tmp_path):
+    log = tmp_path / "progress.jsonl"
+    checkpoint = tmp_path / "progress.ckpt"
+    name = Schedule.from_buckets(task_buckets).names[0]
+    write_log(log, [{"event": "delayed", "task": name, "days": 2}])
+    consumer = ProgressConsumer(Schedule.from_buckets(task_buckets), log, str(checkpoint))
+    consumer.poll()
+    consumer.checkpoint()
+
+    assert ProgressConsumer(Schedule.from_buckets(task_buckets), log, str(checkpoint)).offset > 0
+    longer = Schedule.from_buckets(task_buckets)
+    longer.store.duration[longer.index[name]] += 1
+    linked = Schedule.from_buckets(task_buckets)
+    order = [linked.names[i] for i in linked.order.tolist()]
+    linked.add_dependency(order[-1], order[0])
+    for schedule in (longer, linked):
+        restored = ProgressConsumer(schedule, log, str(checkpoint))
+        assert restored.offset == 0
+        assert restored.schedule.delay[restored.schedule.index[name]] == 0
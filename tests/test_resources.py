@@ -0,0 +1,42 @@
+import pytest
+
+from resources import level_schedule, requirements_for, resource_capacity
+from scheduler import Schedule, field_separator
+from workflows import combined_task_buckets
+
+
+def fields(count):
+    template = Schedule.from_buckets(combined_task_buckets, numeric_end=True)
+    return Schedule.concat([template] * count, [f"F{k}" for k in range(count)])
+
+
+def test_leveled_tasks_stay_within_capacity_and_dependencies():
+    schedule = fields(12)
+    requirements = requirements_for(schedule)
+    leveled = level_schedule(schedule)
+    # Use at each task start, brute force over every task running then
+    for _, _, day, _ in leveled:
+        running = [needs for needs, (_, _, s, e) in zip(requirements, leveled) if s <= day < e]
+        for resource, units in resource_capacity.items():
+            assert sum(needs.get(resource, 0) for needs in running) <= units
+    starts = {name: (s, e) for name, _, s, e in leveled}
+    for i, name in enumerate(schedule.names):
+        s, e = starts[name]
+        assert e - s == schedule.duration[i]
+        assert s >= schedule.start[i]
+        for d in schedule.deps(i):
+            assert s >= starts[schedule.names[d]][1]
+    assert max(e for _, _, _, e in leveled) > schedule.makespan
+
+
+def test_ample_capacity_keeps_the_unconstrained_plan():
+    schedule = fields(3)
+    schedule.apply_delays({f"F1{field_separator}Soil Testing": 2})
+    ample = {resource: 1000 for resource in resource_capacity}
+    assert level_schedule(schedule, ample) == schedule.tasks()
+
+
+def test_a_task_needing_more_than_capacity_is_rejected():
+    schedule = fields(1)
+    with pytest.raises(ValueError, match="Compost Mixing"):
+        level_schedule(schedule, dict(resource_capacity, labour=1))
@@ -0,0 +1,110 @@
+import copy
+import os
+import random
+
+import numpy as np
+
+from benchmark import shapes, synthetic_buckets
+from conftest import root
+from scheduler import Schedule
+from workbook_loader import load_schedule
+
+
+def test_rows_link_tasks_of_one_category_that_meet():
+    schedule = Schedule.from_rows([
+        ("Soil Sampling", "Testing", 0, 2, "None", 0),
+        ("Lab Testing", "Testing", 2, 3, "None", 0),
+    ])
+    schedule.apply_delays({"Soil Sampling": 1})
+    assert schedule.start[schedule.index["Lab Testing"]] == 3
+
+
+def test_rows_link_each_phase_to_the_one_before():
+    schedule = Schedule.from_rows([
+        ("Soil Sampling", "Testing", 0, 2, "None", 0),
+        ("Lab Testing", "Testing", 2, 3, "None", 0),
+        ("Select Crop Variety", "Seed Planning", 5, 1, "None", 0),
+        ("Request Quotation", "Vendor", 6, 1, "None", 0),
+        ("Place Order", "Procurement", 7, 0.5, "None", 0),
+    ])
+    finish = schedule.makespan
+    moved = schedule.apply_delays({"Soil Sampling": 2})
+    assert moved == ["Soil Sampling", "Lab Testing", "Select Crop Variety", "Request Quotation", "Place Order"]
+    assert schedule.makespan == finish + 2
+
+
+def test_rows_link_other_categories_only_into_a_phases_first_tasks():
+    schedule = Schedule.from_rows([
+        ("Seed Procurement", "Procurement", 0, 2, "None", 0),
+        ("Soil Sampling", "Testing", 0, 2, "None", 0),
+        ("Lab Testing", "Testing", 2, 3, "None", 0),
+    ])
+    lab = schedule.index["Lab Testing"]
+    assert [schedule.names[d] for d in schedule.deps(lab)] == ["Soil Sampling"]
+    assert schedule.apply_delays({"Seed Procurement": 2}) == ["Seed Procurement"]
+
+
+def test_early_delay_in_a_planning_workbook_pushes_the_finish():
+    schedule = load_schedule(os.path.join(root, "1- SEED_PROCUREMENT.xlsm"), use_cache=False)
+    finish = schedule.makespan
+    schedule.apply_delays({"Vendor Verification": 2})
+    assert schedule.makespan == finish + 2
+
+
+# The incremental pass against a full rebuild of the same store
+def assert_matches_full_resolve(schedule):
+    fresh = copy.deepcopy(schedule)
+    fresh.resolve()
+    assert np.array_equal(schedule.start, fresh.start)
+    assert np.array_equal(schedule.end, fresh.end)
+
+
+def test_incremental_edits_match_a_full_resolve():
+    rng = random.Random(7)
+    for shape in shapes.values():
+        schedule = Schedule.from_buckets(synthetic_buckets(300, seed=3, **shape))
+        names = schedule.names
+        for _ in range(60):
+            before = schedule.start.copy(), schedule.end.copy()
+            edit = rng.randrange(4)
+            if edit == 0:
+                moved = schedule.set_delay(rng.choice(names), rng.choice((0, 0.5, 2, 5)))
+            elif edit == 1:
+                moved = schedule.set_duration(rng.choice(names), rng.choice((0.5, 1, 4)))
+            elif edit == 2:
+                moved = schedule.apply_delays({name: rng.choice((1, 3)) for name in rng.sample(names, 5)})
+            else:
+                name = rng.choice(names)
+                day = float(schedule.start[schedule.index[name]]) + rng.choice((-1, 0, 2))
+                moved = schedule.apply_progress(started={name: day})
+            assert_matches_full_resolve(schedule)
+            changed = (schedule.start != before[0]) | (schedule.end != before[1])
+            assert sorted(moved) == sorted(names[i] for i in np.flatnonzero(changed))
+
+
+# Total float is the most a task's own delay can grow without moving the
+# finish, and any more moves it day for day; checked on every task
+def test_floats_are_the_slack_before_the_finish_moves():
+    schedule = Schedule.from_buckets(synthetic_buckets(60, seed=5, **shapes["narrow"]))
+    schedule.apply_delays({f"T{i}": 1.5 for i in range(0, 60, 7)})
+    delays = dict(zip(schedule.names, schedule.delay.tolist()))
+    floats = dict(zip(schedule.names, schedule.floats()))
+    critical = set(schedule.critical_path())
+    finish = schedule.makespan
+    for name, slack in floats.items():
+        probe = copy.deepcopy(schedule)
+        probe.set_delay(name, delays[name] + slack)
+        assert probe.makespan == finish
+        probe.set_delay(name, delays[name] + slack + 0.5)
+        assert probe.makespan == finish + 0.5
+        assert (slack == 0) == (name in critical)
+
+
+def test_critical_path_runs_from_a_root_to_the_finish():
+    schedule = Schedule.from_buckets(synthetic_buckets(200, seed=2, **shapes["wide"]))
+    path = schedule.critical_path()
+    index = schedule.index
+    assert schedule.end[index[path[-1]]] == schedule.makespan
+    for name in path[1:]:
+        deps = [schedule.names[d] for d in schedule.deps(index[name])]
+        assert not deps or any(dep in path for dep in deps)
@@ -0,0 +1,22 @@
+import asyncio
+
+from whatif_service import WhatIfService
+
+
+def test_coalesced_requests_are_not_cache_misses():
+    service = WhatIfService("seed")
+
+    async def run():
+        delays = {"Vendor Approval": 2}
+        first = await asyncio.gather(*(service.what_if(delays) for _ in range(3)))
+        again = await service.what_if(delays)
+        return [how for _, how in first] + [again[1]]
+
+    try:
+        served = asyncio.run(run())
+    finally:
+        service.pool.shutdown()
+    assert served == ["miss", "coalesced", "coalesced", "hit"]
+    stats = service.stats()
+    assert stats["coalesced"] == 2
+    assert (stats["cache"]["hits"], stats["cache"]["misses"]) == (1, 1)
@@ -0,0 +1,53 @@
+import datetime
+
+import numpy as np
+
+from work_calendar import WorkCalendar, region_calendar
+
+season = datetime.date(2026, 6, 1)
+monsoon = (datetime.date(2026, 7, 1), datetime.date(2026, 7, 10))
+holiday = (datetime.date(2026, 8, 15), datetime.date(2026, 8, 15))
+
+
+def brute_working(calendar, day):
+    date = season + datetime.timedelta(days=day)
+    closed = any(first <= date <= last for first, last in calendar.closed)
+    return date.weekday() not in calendar.rest_weekdays and not closed
+
+
+# A short horizon makes the lookups grow the tables several times
+def test_offsets_match_a_day_by_day_walk():
+    calendar = WorkCalendar(season, [monsoon, holiday], rest_weekdays=[6], horizon=20)
+    days = range(0, 900)
+    working = [brute_working(calendar, d) for d in days]
+    before = np.concatenate([[0], np.cumsum(working)])
+    work_days = [d for d, w in zip(days, working) if w]
+    assert [calendar.is_working(season + datetime.timedelta(days=d)) for d in days] == working
+    assert calendar.working_offset(list(days)).tolist() == before[:-1].tolist()
+    assert calendar.calendar_offset(list(range(len(work_days)))).tolist() == work_days
+    # Half a working day in, on either side of a closure
+    k = work_days.index(29)
+    assert calendar.calendar_offset(k + 0.5) == 29.5
+    assert calendar.working_offset(29.5) == k + 0.5
+
+
+def test_spans_end_on_their_last_working_day():
+    calendar = WorkCalendar(season, [monsoon], rest_weekdays=[5, 6])
+    # Five working days from Monday June 29: the monsoon closure pushes the
+    # last three to Monday-Wednesday July 13-15
+    start = calendar.working_offset(calendar.day_of(datetime.date(2026, 6, 29)))
+    first, last = calendar.span_dates([start], [start + 5])
+    assert str(first[0]) == "2026-06-29" and str(last[0]) == "2026-07-15"
+    assert calendar.add_working_days(datetime.date(2026, 6, 26), 1) == datetime.date(2026, 6, 29)
+    assert calendar.working_days_between(datetime.date(2026, 6, 29), datetime.date(2026, 7, 13)) == 2
+
+
+def test_region_calendars_from_a_closures_file(tmp_path):
+    path = tmp_path / "closures.csv"
+    path.write_text("region,first,last,reason\n*,sunday,,Weekly rest\nNorth,2026-08-15,2026-08-15,Holiday\n",
+                    encoding="utf-8")
+    north = region_calendar("North", "2026-06-01", str(path))
+    south = region_calendar("South", "2026-06-01", str(path))
+    assert north.rest_weekdays == south.rest_weekdays == (6,)
+    assert not north.is_working(datetime.date(2026, 8, 15))
+    assert south.is_working(datetime.date(2026, 8, 15))
@@ -0,0 +1,36 @@
+import numpy as np
+import openpyxl
+
+from batch_gantt import schedule_field, write_rows
+from workbook_loader import load_schedule, parse_workbook
+from workbook_update import PlanningWorkbook
+
+
+def test_resolved_export_does_not_count_delays_twice(tmp_path):
+    path = tmp_path / "seed.xlsx"
+    field = {"field_id": "seed", "region": "default", "start_offset": 0, "durations": {},
+             "delays": {"Seed Conditioning": 2}}
+    rows = schedule_field("seed", field)
+    write_rows(str(path), rows)
+    schedule = load_schedule(str(path), use_cache=False)
+    exported = {row[2]: (row[4], row[7]) for row in rows}
+    for name, (start, end) in exported.items():
+        i = schedule.index[name]
+        assert np.isclose(schedule.start[i], start) and np.isclose(schedule.end[i], end)
+    assert PlanningWorkbook(str(path)).rows() == parse_workbook(str(path))
+
+
+def test_blank_rows_before_a_later_sheets_table(tmp_path):
+    path = tmp_path / "two.xlsx"
+    workbook = openpyxl.Workbook()
+    first = workbook.active
+    first.append(["Task", "Category", "Start", "Duration"])
+    first.append(["Soil Sampling", "Testing", 0, 1])
+    second = workbook.create_sheet("Compost")
+    second.append(["Task", "Category", "Start", "Duration"])
+    second.append([None])
+    second.append(["Pit Marking", "Compost", 0, 1])
+    workbook.save(path)
+    names = [row[0] for row in parse_workbook(str(path))]
+    assert names == ["Soil Sampling", "Pit Marking"]
+    assert [t.name for t in PlanningWorkbook(str(path)).tasks] == names
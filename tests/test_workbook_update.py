@@ -0,0 +1,77 @@
+import os
+import shutil
+import zipfile
+
+import openpyxl
+
+from batch_gantt import schedule_field, write_rows
+from conftest import root
+from workbook_update import PlanningWorkbook, timeline_day, update_workbook
+
+
+def export_seed(path):
+    field = {"field_id": "seed", "region": "default", "start_offset": 0, "durations": {}, "delays": {}}
+    write_rows(str(path), schedule_field("seed", field))
+
+
+def bars(path):
+    sheet = openpyxl.load_workbook(path).active
+    header = [c.value for c in sheet[1]]
+    first_day = next(i for i, v in enumerate(header) if timeline_day(v) is not None)
+    cells = {}
+    for row in sheet.iter_rows(min_row=2, min_col=first_day + 1):
+        for cell in row:
+            if cell.value is not None:
+                cells[cell.row] = cell.coordinate
+    merged = {r.min_row: (r.coord.split(":")[0], r.coord) for r in sheet.merged_cells.ranges}
+    return cells, merged
+
+
+# Timeline column of a task's bar in a planning workbook
+def bar_column(path, name):
+    workbook = PlanningWorkbook(str(path))
+    task = next(t for t in workbook.tasks if t.name == name)
+    return workbook._bar_label(task, task.sheet.timeline()[0])
+
+
+def test_timeline_headers():
+    assert timeline_day("Day 3") == 3
+    assert timeline_day("Day 1.5") == 1.5
+    assert timeline_day("Day 2 06:00") == 2.25
+    assert timeline_day("Week 2") == 7
+    assert timeline_day("2026-07-02") - timeline_day("2026-07-01") == 1
+    assert timeline_day("Task") is None
+
+
+def test_moved_bars_keep_their_merged_ranges(tmp_path):
+    path = tmp_path / "seed.xlsx"
+    export_seed(path)
+    workbook = PlanningWorkbook(str(path))
+    first = workbook.tasks[0].name
+    result = update_workbook(str(path), {first: 2})
+    assert result["written"] and result["bars_moved"] and not result["bars_skipped"]
+    labels, merged = bars(path)
+    # Every merged bar starts at its label cell
+    for row, (start, _) in merged.items():
+        assert labels[row] == start
+    with zipfile.ZipFile(path) as z:
+        assert z.testzip() is None
+
+
+def test_unchanged_workbook_is_not_written(tmp_path):
+    path = tmp_path / "seed.xlsx"
+    export_seed(path)
+    before = path.read_bytes()
+    assert update_workbook(str(path), {})["written"] is False
+    assert path.read_bytes() == before
+
+
+def test_delay_moves_the_bars_of_later_phases(tmp_path):
+    path = tmp_path / "seed.xlsm"
+    shutil.copy(os.path.join(root, "1- SEED_PROCUREMENT.xlsm"), path)
+    before = bar_column(path, "Storage Planning")
+    result = update_workbook(str(path), {"Vendor Verification": 2})
+    assert "Storage Planning" not in result["bars_skipped"]
+    assert result["makespan"] == 10
+    # Day-wide timeline cells: the Procurement bar moves two days along
+    assert bar_column(path, "Storage Planning") == before + 2
@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+# Load test for whatif_service: many concurrent planners on keep-alive
+# connections, each posting what-if requests drawn from a fixed pool of
+# scenarios, so the run exercises misses, coalesced requests and cache hits.
+#   python whatif_service.py --workers 4 &
+#   python whatif_loadtest.py --clients 300 --requests 50 --scenarios 500
+
+
+async def request(reader, writer, host, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, data
+
+
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        status, _, data = await request(reader, writer, host, "GET", path)
+    finally:
+        writer.close()
+    return json.loads(data)
+
+
+# `count` delay maps of one to three tasks, 1-5 days each
+def make_scenarios(names, count, seed=None):
+    rng = random.Random(seed)
+    return [
+        {name: rng.randint(1, 5) for name in rng.sample(names, min(len(names), rng.randint(1, 3)))}
+        for _ in range(count)
+    ]
+
+
+async def planner(host, port, scenarios, requests, rng, latencies, served):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            try:
+                status, headers, _ = await request(reader, writer, host, "POST", "/whatif",
+                                                   {"delays": rng.choice(scenarios)})
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                served["error"] = served.get("error", 0) + 1
+                return
+            latencies.append(time.perf_counter() - t0)
+            outcome = headers.get("x-cache", "miss") if status == 200 else f"http {status}"
+            served[outcome] = served.get(outcome, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(host, port, clients, requests, scenario_count, seed):
+    plan = await fetch(host, port, "/plan")
+    scenarios = make_scenarios([t["task"] for t in plan["tasks"]], scenario_count, seed)
+    latencies, served = [], {}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        planner(host, port, scenarios, requests, random.Random(None if seed is None else seed + k), latencies, served)
+        for k in range(clients)
+    ))
+    elapsed = time.perf_counter() - t0
+    stats = await fetch(host, port, "/stats")
+
+    ms = np.array(latencies) * 1000
+    print(f"{len(latencies)} requests from {clients} clients in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} req/s) against {len(plan['tasks'])} tasks")
+    if len(ms):
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        print(f"Latency ms: p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}  max {ms.max():.1f}")
+    print("Served: " + ", ".join(f"{k} {v}" for k, v in sorted(served.items())))
+    print(f"Server: {stats['requests']} requests, {stats['coalesced']} coalesced, cache {stats['cache']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the what-if scheduling service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=200, help="concurrent planners")
+    parser.add_argument("--requests", type=int, default=20, help="requests per planner")
+    parser.add_argument("--scenarios", type=int, default=200, help="distinct delay maps to draw from")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.clients, args.requests, args.scenarios, args.seed))
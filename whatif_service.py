@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import instrument
+from instrument import count
+from scenario_cache import ScenarioCache, delay_key
+
+# Local what-if scheduling service, so planners share one plan held in memory
+# instead of each running a Tk window that rebuilds it. HTTP/JSON on asyncio:
+#   GET  /plan     the base schedule
+#   POST /whatif   {"delays": {"Pit Readiness": 2, ...}} -> the schedule under those delays
+#   GET  /stats    request, coalescing and cache counters
+# Schedules are {"makespan", "delays", "tasks": [{"task", "category",
+# "start", "end", "critical"}]}. Scenarios are resolved in a process pool whose
+# workers each hold a copy of the plan; identical requests in flight share one
+# computation and finished ones are kept in an LRU cache.
+
+max_body = 1 << 20
+
+reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+# The plan held by this process (the server, or one pool worker)
+_plan = None
+
+
+def load_plan(template, fields_path=None):
+    global _plan
+    from progress_log import build_plan
+
+    _plan = build_plan(template, fields_path)
+    return _plan
+
+
+def encode_schedule(schedule, delay_map):
+    tasks, critical, makespan = schedule.snapshot()
+    return json.dumps({
+        "makespan": makespan,
+        "delays": delay_map,
+        "tasks": [
+            {"task": name, "category": category, "start": start, "end": end, "critical": name in critical}
+            for name, category, start, end in tasks
+        ],
+    }).encode("utf-8")
+
+
+# Runs in a pool worker against that worker's plan; apply_delays only moves
+# the tasks whose delay differs from the worker's previous scenario
+def resolve_scenario(delay_map):
+    _plan.apply_delays(delay_map)
+    return encode_schedule(_plan, delay_map)
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def response(status, body, headers=(), keep_alive=True):
+    head = [
+        f"HTTP/1.1 {status} {reasons[status]}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    head.extend(f"{name}: {value}" for name, value in headers)
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def error_body(message):
+    return json.dumps({"error": message}).encode("utf-8")
+
+
+# (method, path, headers, body) for the next request on a connection, or None
+# once the client has closed it
+async def read_request(reader):
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HttpError(400, "bad Content-Length")
+    if length > max_body:
+        raise HttpError(413, f"request body over {max_body} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+class WhatIfService:
+    def __init__(self, template="combined", fields_path=None, workers=1, cache_size=256):
+        self.schedule = load_plan(template, fields_path)
+        self.base = encode_schedule(self.schedule, {})
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=load_plan, initargs=(template, fields_path))
+        self.workers = workers
+        self.cache = ScenarioCache(cache_size)
+        self.inflight = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    # Validated {task: days} from a /whatif body
+    def parse_delays(self, body):
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "body is not JSON")
+        delays = payload.get("delays", {}) if isinstance(payload, dict) else None
+        if not isinstance(delays, dict):
+            raise HttpError(400, 'expected {"delays": {task: days}}')
+        unknown = sorted(name for name in delays if name not in self.schedule.index)
+        if unknown:
+            raise HttpError(400, f"unknown tasks: {', '.join(unknown[:10])}")
+        bad = sorted(name for name, days in delays.items()
+                     if isinstance(days, bool) or not isinstance(days, (int, float)) or not math.isfinite(days))
+        if bad:
+            raise HttpError(400, f"delays must be numbers of days: {', '.join(bad[:10])}")
+        return delays
+
+    # Encoded schedule and how it was served: hit, coalesced or miss
+    async def what_if(self, delay_map):
+        self.requests += 1
+        count("whatif_requests")
+        version = self.schedule.version
+        key = delay_key(delay_map)
+        # Checked before the cache so that requests joining a computation are
+        # counted as coalesced, not as cache misses; a scenario is never both
+        # in flight and cached
+        future = self.inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            count("whatif_coalesced")
+            return await asyncio.shield(future), "coalesced"
+        body = self.cache.get(version, delay_map)
+        if body is not None:
+            return body, "hit"
+        future = asyncio.get_running_loop().run_in_executor(self.pool, resolve_scenario, dict(key))
+        self.inflight[key] = future
+        future.add_done_callback(lambda done: self.finished(version, key, done))
+        # Shielded so a client hanging up does not cancel the work for the
+        # requests coalesced onto it
+        return await asyncio.shield(future), "miss"
+
+    def finished(self, version, key, future):
+        del self.inflight[key]
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(version, dict(key), future.result())
+
+    def stats(self):
+        return {
+            "tasks": len(self.schedule),
+            "version": self.schedule.version,
+            "workers": self.workers,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "in_flight": len(self.inflight),
+            "cache": self.cache.stats(),
+        }
+
+    # (status, body, extra headers) for one request
+    async def route(self, method, path, body):
+        routes = {"/plan": "GET", "/stats": "GET", "/whatif": "POST"}
+        if path not in routes:
+            raise HttpError(404, f"no such endpoint: {path}")
+        if method != routes[path]:
+            raise HttpError(405, f"{path} expects {routes[path]}")
+        if path == "/plan":
+            return 200, self.base, ()
+        if path == "/stats":
+            return 200, json.dumps(self.stats()).encode("utf-8"), ()
+        delay_map = self.parse_delays(body)
+        try:
+            result, served = await self.what_if(delay_map)
+        except Exception as e:
+            raise HttpError(500, f"scenario failed: {e}")
+        return 200, result, (("X-Cache", served),)
+
+    # One keep-alive connection; errors answer the request and close it
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, payload, extra = await self.route(method, path, body)
+                except HttpError as e:
+                    writer.write(response(e.status, error_body(str(e)), keep_alive=False))
+                    await writer.drain()
+                    break
+                writer.write(response(status, payload, extra, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        print(f"✅ What-if service for {len(self.schedule)} tasks on http://{host}:{port} "
+              f"({self.workers} worker(s))")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+# Service arguments, shared with `gantt_cli.py serve`
+def add_arguments(parser):
+    from batch_gantt import templates_help
+
+    parser.add_argument("--template", default="combined", help=templates_help)
+    parser.add_argument("--fields", help="CSV of fields to merge into one plan")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="processes resolving scenarios")
+    parser.add_argument("--cache-size", type=int, default=256, help="finished scenarios kept")
+
+
+def run(args):
+    service = WhatIfService(args.template, args.fields, args.workers, args.cache_size)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve what-if schedules for a shared plan over HTTP")
+    add_arguments(parser)
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+    run(args)
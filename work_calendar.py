@@ -0,0 +1,124 @@
+import csv
+import datetime
+import functools
+
+import numpy as np
+
+weekday_names = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+# Working calendar from a season start date. Schedules keep counting in
+# working days; the calendar maps those offsets to calendar days through two
+# precomputed tables: `cumulative[d]`, the working days before calendar day d,
+# and `work_days[k]`, the calendar day of the k-th working day. Each
+# conversion is then an array lookup instead of a walk over the days, and
+# whole columns of start/end offsets convert at once. The tables double in
+# length whenever a lookup runs past them.
+class WorkCalendar:
+    def __init__(self, start, closed=(), rest_weekdays=(), horizon=366):
+        if len(set(rest_weekdays)) >= 7:
+            raise ValueError("A working calendar needs at least one working weekday")
+        self.start = start
+        self.closed = sorted(closed)
+        self.rest_weekdays = tuple(sorted(set(rest_weekdays)))
+        self._build(horizon)
+
+    def _build(self, days):
+        weekday = (self.start.weekday() + np.arange(days)) % 7
+        working = ~np.isin(weekday, self.rest_weekdays)
+        for first, last in self.closed:
+            working[max(0, (first - self.start).days):max(0, (last - self.start).days + 1)] = False
+        self.working = working
+        self.cumulative = np.concatenate([[0], np.cumsum(working)])
+        self.work_days = np.flatnonzero(working)
+
+    # Grow the tables until they cover calendar day `day` and working day `work`
+    def _cover(self, day=0, work=0):
+        days = len(self.working)
+        while days <= day or len(self.work_days) <= work:
+            days *= 2
+            self._build(days)
+
+    def day_of(self, date):
+        return (date - self.start).days
+
+    def date_of(self, day):
+        return self.start + datetime.timedelta(days=int(day))
+
+    def is_working(self, date):
+        day = self.day_of(date)
+        self._cover(day=day)
+        return day >= 0 and bool(self.working[day])
+
+    # Working-day offsets of calendar-day offsets; a non-working day maps to
+    # the start of the next working day
+    def working_offset(self, days):
+        days = np.asarray(days, dtype=float)
+        whole = np.floor(days).astype(np.int64).clip(0)
+        self._cover(day=int(whole.max(initial=0)))
+        frac = np.where(self.working[whole], days - np.floor(days), 0.0)
+        return self.cumulative[whole] + frac
+
+    # Calendar-day offsets of working-day offsets. With end=True an offset on
+    # a whole day is read as the end of the previous working day, so a task
+    # finishing on a Friday does not stretch over the weekend.
+    def calendar_offset(self, work, end=False):
+        work = np.asarray(work, dtype=float)
+        whole = (np.ceil(work) - 1 if end else np.floor(work)).astype(np.int64).clip(0)
+        self._cover(work=int(whole.max(initial=0)))
+        return self.work_days[whole] + (work - whole)
+
+    # First and last calendar dates of [start, end) working-day spans
+    def span_dates(self, start, end):
+        start = np.asarray(start, dtype=float)
+        end = np.maximum(np.asarray(end, dtype=float), start)
+        first = np.floor(self.calendar_offset(start)).astype(np.int64)
+        last = np.maximum(np.ceil(self.calendar_offset(end, end=True)).astype(np.int64) - 1, first)
+        origin = np.datetime64(self.start, "D")
+        return origin + first, origin + last
+
+    def add_working_days(self, date, days):
+        work = float(self.working_offset(self.day_of(date))) + days
+        return self.date_of(np.floor(self.calendar_offset(work)))
+
+    def working_days_between(self, first, last):
+        return float(self.working_offset(self.day_of(last)) - self.working_offset(self.day_of(first)))
+
+
+def parse_date(text):
+    return datetime.date.fromisoformat(text.strip())
+
+
+# Non-working days per region from a CSV of region, first, last, reason rows:
+#   North,2026-08-15,2026-08-15,Independence Day
+#   North,2026-07-01,2026-07-10,Monsoon closure
+#   *,sunday,,Weekly rest
+# A weekday name in `first` makes that weekday a rest day; region "*" (or
+# blank) applies to every region. Read once per process.
+@functools.lru_cache(maxsize=None)
+def read_closures(path):
+    closures = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            region = (row.get("region") or "*").strip() or "*"
+            first = (row.get("first") or "").strip()
+            rest, closed = closures.setdefault(region, (set(), []))
+            if first.lower() in weekday_names:
+                rest.add(weekday_names.index(first.lower()))
+            elif first:
+                closed.append((parse_date(first), parse_date(row.get("last") or first)))
+    return closures
+
+
+# One calendar per region and season, shared by every field planned in this
+# process; without a closures file every day is a working day
+@functools.lru_cache(maxsize=None)
+def region_calendar(region, season_start, path=None):
+    closures = read_closures(path) if path else {}
+    rest, closed = set(), []
+    for key in ("*", region):
+        if key in closures:
+            rest |= closures[key][0]
+            closed += closures[key][1]
+    start = parse_date(season_start) if isinstance(season_start, str) else season_start
+    return WorkCalendar(start, closed, rest)
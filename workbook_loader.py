@@ -0,0 +1,152 @@
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+from instrument import timed
+from scheduler import Schedule
+
+# Parsed workbooks are cached here, next to the workbook, unless overridden
+cache_dir_name = ".gantt_cache"
+cache_version = 2
+
+# Header spellings used across the planning workbooks
+column_aliases = {
+    "task": "Task",
+    "category": "Category",
+    "start": "Start",
+    "end": "End",
+    "duration": "Duration",
+    "delay": "Delay",
+    "delay days": "Delay",
+    "delay scenario": "Cause",
+    "possible delay cause": "Cause",
+    "adj start": "Adj Start",
+    "adjusted start": "Adj Start",
+    "actual start": "Actual Start",
+    "total float": "Total Float",
+}
+
+# Columns only written by the exporters that hold resolved schedules
+resolved_markers = ("End", "Actual Start", "Total Float")
+
+
+def _header_columns(row):
+    columns = {}
+    for i, value in enumerate(row):
+        key = column_aliases.get(str(value).strip().lower()) if value is not None else None
+        if key and key not in columns:
+            columns[key] = i
+    return columns
+
+
+# A table whose Start already includes the delay (batch and progress
+# exports). Planning workbooks keep the planned Start and show the delayed
+# one in a separate Adjusted Start column.
+def resolved_table(columns):
+    return "Adj Start" not in columns and any(key in columns for key in resolved_markers)
+
+
+def _cell(row, columns, key):
+    i = columns.get(key)
+    return row[i] if i is not None and i < len(row) else None
+
+
+def _number(value, default=0):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+
+
+# Stream the task table out of every sheet that has a "Task" header row.
+# Returns rows of (name, category, start, duration, cause, delay), where start
+# is the planned start before the delay, also for resolved exports.
+@timed("load.parse")
+def parse_workbook(path):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    rows = []
+    seen = {}
+    try:
+        for worksheet in workbook.worksheets:
+            columns = None
+            found = 0
+            for row in worksheet.iter_rows(values_only=True):
+                if columns is None:
+                    header = _header_columns(row)
+                    if "Task" in header and "Start" in header:
+                        columns = header
+                        resolved = resolved_table(columns)
+                    continue
+                name = _cell(row, columns, "Task")
+                if name is None or str(name).strip() == "":
+                    if found:
+                        break
+                    continue
+                start = _cell(row, columns, "Start")
+                if not isinstance(start, (int, float)):
+                    continue
+                if "Duration" in columns:
+                    duration = _number(_cell(row, columns, "Duration"))
+                else:
+                    duration = _number(_cell(row, columns, "End"), start) - start
+                delay = _number(_cell(row, columns, "Delay"))
+                name = str(name).strip()
+                seen[name] = seen.get(name, 0) + 1
+                if seen[name] > 1:
+                    name = f"{name} ({seen[name]})"
+                rows.append((name, _cell(row, columns, "Category") or worksheet.title,
+                             start - delay if resolved else start, duration,
+                             _cell(row, columns, "Cause") or "None", delay))
+                found += 1
+    finally:
+        workbook.close()
+    return rows
+
+
+def cache_path(path, cache_dir=None):
+    path = os.path.abspath(path)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(path), cache_dir_name)
+    digest = hashlib.sha1(path.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.pickle")
+
+
+# Parsed rows for a workbook, reusing the cache while the file's path, mtime
+# and size are unchanged
+def load_rows(path, cache_dir=None, use_cache=True):
+    stat = os.stat(path)
+    key = (cache_version, os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    cached = cache_path(path, cache_dir)
+    if use_cache:
+        try:
+            with open(cached, "rb") as f:
+                cached_key, rows = pickle.load(f)
+            if cached_key == key:
+                return rows
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            pass
+
+    rows = parse_workbook(path)
+    if use_cache:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        temp = f"{cached}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            pickle.dump((key, rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, cached)
+    return rows
+
+
+# Workbook -> Schedule, with the sheet's Delay column applied
+def load_schedule(path, cache_dir=None, use_cache=True):
+    rows = load_rows(path, cache_dir, use_cache)
+    schedule = Schedule.from_rows(rows)
+    schedule.apply_delays({row[0]: row[5] for row in rows if row[5]})
+    return schedule
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        t0 = time.perf_counter()
+        schedule = load_schedule(path)
+        print(f"{path}: {len(schedule)} tasks, makespan {schedule.makespan:g} days "
+              f"({(time.perf_counter() - t0) * 1000:.1f} ms)")
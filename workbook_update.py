@@ -0,0 +1,501 @@
+import argparse
+import datetime
+import math
+import os
+import posixpath
+import re
+import sys
+import zipfile
+from collections import Counter
+from xml.sax.saxutils import unescape
+
+import instrument
+from instrument import count, timed
+from scheduler import Schedule
+from workbook_loader import _header_columns, _number, resolved_table
+
+# In-place update of an existing planning workbook (.xlsx or macro-enabled
+# .xlsm) after delay edits. The sheet XML inside the zip is patched directly:
+# only the rows whose Delay, Adjusted Start (Start and End in resolved
+# exports) or bar cells change are rewritten, along with the merged ranges of
+# moved bars, and every other part of the package, vbaProject.bin included, is
+# copied through byte for byte.
+# Nothing is written when nothing changed.
+
+_row_re = re.compile(r"<row\b([^>]*?)(?:/>|>(.*?)</row>)", re.S)
+_cell_re = re.compile(r"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.S)
+_attr_re = re.compile(r'([\w:]+)="([^"]*)"')
+_ref_re = re.compile(r"([A-Z]+)(\d+)")
+# Timeline headers: "Day 3", "Day 1.5", "Day 2 06:00", "Week 4" or an ISO date
+_timeline_re = re.compile(r"^\s*(?:Day\s+(\d+(?:\.\d+)?)(?:\s+(\d{1,2}):(\d{2}))?|Week\s+(\d+)|(\d{4}-\d{2}-\d{2}))\s*$",
+                          re.I)
+_entities = {"&quot;": '"', "&apos;": "'"}
+_merge_re = re.compile(r'<mergeCell\b[^>]*\bref="([A-Z]+)(\d+):([A-Z]+)(\d+)"[^>]*/>')
+_merges_re = re.compile(r"<mergeCells\b.*?</mergeCells>|<mergeCells\b[^>]*/>", re.S)
+# Worksheet elements that come before <mergeCells> in the schema
+_before_merges = ("sheetData", "sheetCalcPr", "sheetProtection", "protectedRanges", "scenarios", "autoFilter",
+                  "sortState", "dataConsolidate", "customSheetViews")
+
+
+def col_index(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def col_name(i):
+    name = ""
+    i += 1
+    while i:
+        i, rem = divmod(i - 1, 26)
+        name = chr(65 + rem) + name
+    return name
+
+
+# Day a timeline header stands for (dates as day ordinals), or None
+def timeline_day(text):
+    m = _timeline_re.match(text) if isinstance(text, str) else None
+    if m is None:
+        return None
+    day, hour, minute, week, date = m.groups()
+    if day is not None:
+        return float(day) + (int(hour) * 60 + int(minute)) / 1440 if hour else float(day)
+    if week is not None:
+        return (int(week) - 1) * 7.0
+    return float(datetime.date.fromisoformat(date).toordinal())
+
+
+def number_text(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Cell:
+    __slots__ = ("col", "attrs", "inner")
+
+    def __init__(self, col, attrs, inner):
+        self.col = col
+        self.attrs = attrs
+        self.inner = inner
+
+    @classmethod
+    def parse(cls, attr_text, inner):
+        attrs = dict(_attr_re.findall(attr_text))
+        return cls(col_index(_ref_re.match(attrs["r"]).group(1)), attrs, inner or "")
+
+    def xml(self):
+        attrs = "".join(f' {k}="{v}"' for k, v in self.attrs.items())
+        return f"<c{attrs}>{self.inner}</c>" if self.inner else f"<c{attrs}/>"
+
+    @property
+    def formula(self):
+        return "<f" in self.inner
+
+    def value(self, strings):
+        v = re.search(r"<v>(.*?)</v>", self.inner, re.S)
+        kind = self.attrs.get("t")
+        if kind == "s":
+            return strings[int(v.group(1))] if v else None
+        if kind == "inlineStr":
+            return "".join(unescape(t, _entities) for t in re.findall(r"<t[^>]*>(.*?)</t>", self.inner, re.S))
+        if v is None:
+            return None
+        if kind in ("str", "e"):
+            return unescape(v.group(1), _entities)
+        if kind == "b":
+            return v.group(1) == "1"
+        return float(v.group(1))
+
+    # Store a number, keeping a formula (only its cached result changes)
+    def set_number(self, value):
+        self.attrs.pop("t", None)
+        if self.formula:
+            self.inner = re.sub(r"<v>.*?</v>", "", self.inner, flags=re.S) + f"<v>{number_text(value)}</v>"
+        else:
+            self.inner = f"<v>{number_text(value)}</v>"
+
+
+class Row:
+    __slots__ = ("number", "attrs", "cells", "span", "changed")
+
+    def __init__(self, number, attrs, cells, span):
+        self.number = number
+        self.attrs = attrs
+        self.cells = cells
+        self.span = span
+        self.changed = False
+
+    def cell(self, col, style=None):
+        cell = self.cells.get(col)
+        if cell is None:
+            cell = self.cells[col] = Cell(col, {"r": f"{col_name(col)}{self.number}"}, "")
+            if style is not None:
+                cell.attrs["s"] = style
+        return cell
+
+    def xml(self):
+        attrs = self.attrs
+        spans = re.search(r'spans="(\d+):(\d+)"', attrs)
+        if spans and self.cells and not int(spans.group(1)) - 1 <= min(self.cells) <= max(self.cells) <= int(spans.group(2)) - 1:
+            attrs = attrs.replace(spans.group(0), "").rstrip()
+        cells = "".join(self.cells[c].xml() for c in sorted(self.cells))
+        return f"<row{attrs}>{cells}</row>"
+
+
+class Sheet:
+    def __init__(self, path, xml, strings):
+        self.path = path
+        self.xml = xml
+        self.strings = strings
+        self.rows = []
+        for m in _row_re.finditer(xml):
+            attrs = m.group(1)
+            number = int(re.search(r'\br="(\d+)"', attrs).group(1))
+            cells = {}
+            for c in _cell_re.finditer(m.group(2) or ""):
+                cell = Cell.parse(c.group(1), c.group(2))
+                cells[cell.col] = cell
+            self.rows.append(Row(number, attrs, cells, m.span()))
+        # Merged ranges as [first col, first row, last col, last row]
+        self.merges = [[col_index(a), int(r0), col_index(b), int(r1)] for a, r0, b, r1 in _merge_re.findall(xml)]
+        self.merges_changed = False
+
+    # The single-row merged range holding `col` of row `number`, if any
+    def merge_at(self, number, col):
+        for merge in self.merges:
+            if merge[1] == merge[3] == number and merge[0] <= col <= merge[2]:
+                return merge
+        return None
+
+    def values(self, row):
+        values = [None] * (max(row.cells, default=-1) + 1)
+        for col, cell in row.cells.items():
+            values[col] = cell.value(self.strings)
+        return values
+
+    # Timeline columns in order and the days each cell spans, from the first
+    # row with two or more timeline headers; ([], 1) when there is none
+    def timeline(self):
+        for row in self.rows:
+            days = sorted((c, day) for c, cell in row.cells.items()
+                          if (day := timeline_day(cell.value(self.strings))) is not None)
+            if len(days) > 1:
+                steps = [b - a for (_, a), (_, b) in zip(days, days[1:]) if b > a]
+                return [c for c, _ in days], min(steps, default=1.0)
+        return [], 1.0
+
+    def _merges_xml(self):
+        if not self.merges:
+            return ""
+        refs = "".join(f'<mergeCell ref="{col_name(c0)}{r0}:{col_name(c1)}{r1}"/>' for c0, r0, c1, r1 in self.merges)
+        return f'<mergeCells count="{len(self.merges)}">{refs}</mergeCells>'
+
+    def patched(self):
+        changed = [row for row in self.rows if row.changed]
+        if not changed and not self.merges_changed:
+            return None
+        parts, last = [], 0
+        for row in changed:
+            parts.append(self.xml[last:row.span[0]])
+            parts.append(row.xml())
+            last = row.span[1]
+        parts.append(self.xml[last:])
+        xml = "".join(parts)
+        if self.merges_changed:
+            if _merges_re.search(xml):
+                xml = _merges_re.sub(lambda m: self._merges_xml(), xml, count=1)
+            elif self.merges:
+                at = max(m.end() for tag in _before_merges
+                         for m in re.finditer(rf"</{tag}>|<{tag}\b[^>]*/>", xml))
+                xml = xml[:at] + self._merges_xml() + xml[at:]
+        return xml
+
+
+# A task row of a sheet: the parsed values parse_workbook would return for it,
+# plus where its Delay, Adjusted Start and bar cells live. In a resolved
+# export (see workbook_loader.resolved_table) Start and End hold the delayed
+# dates, so those are the cells that change.
+class TaskRow:
+    __slots__ = ("sheet", "row", "name", "label", "category", "start", "duration", "cause", "delay", "columns",
+                 "resolved")
+
+    def __init__(self, sheet, row, name, label, values, columns):
+        self.sheet = sheet
+        self.row = row
+        self.name = name
+        self.label = label
+        self.columns = columns
+        get = lambda key: values[columns[key]] if key in columns and columns[key] < len(values) else None
+        self.category = get("Category")
+        self.start = get("Start")
+        if "Duration" in columns:
+            self.duration = _number(get("Duration"))
+        else:
+            self.duration = _number(get("End"), self.start) - self.start
+        self.cause = get("Cause") or "None"
+        self.delay = _number(get("Delay"))
+        self.resolved = resolved_table(columns)
+        if self.resolved:
+            self.start -= self.delay
+
+
+class PlanningWorkbook:
+    def __init__(self, path):
+        self.path = path
+        with zipfile.ZipFile(path) as z:
+            names = set(z.namelist())
+            self.workbook_xml = z.read("xl/workbook.xml").decode("utf-8")
+            rels = z.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+            strings = []
+            if "xl/sharedStrings.xml" in names:
+                for si in re.findall(r"<si>(.*?)</si>", z.read("xl/sharedStrings.xml").decode("utf-8"), re.S):
+                    strings.append("".join(unescape(t, _entities) for t in re.findall(r"<t[^>]*>(.*?)</t>", si, re.S)))
+            targets = {}
+            for rel in re.findall(r"<Relationship\b[^>]*>", rels):
+                attrs = dict(_attr_re.findall(rel))
+                target = attrs["Target"]
+                targets[attrs["Id"]] = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+            self.sheets = []
+            for sheet in re.findall(r"<sheet\b[^>]*>", self.workbook_xml):
+                attrs = dict(_attr_re.findall(sheet))
+                path_in_zip = targets[attrs["r:id"]]
+                self.sheets.append((attrs["name"], Sheet(path_in_zip, z.read(path_in_zip).decode("utf-8"), strings)))
+        self.tasks = self._task_rows()
+
+    # Same table rules as workbook_loader.parse_workbook, so names (including
+    # the "(2)" suffix of repeated tasks) match the loader's
+    def _task_rows(self):
+        tasks = []
+        seen = {}
+        for title, sheet in self.sheets:
+            columns = None
+            found = 0
+            for row in sheet.rows:
+                values = sheet.values(row)
+                if columns is None:
+                    header = _header_columns(values)
+                    if "Task" in header and "Start" in header:
+                        columns = header
+                    continue
+                name = values[columns["Task"]] if columns["Task"] < len(values) else None
+                if name is None or str(name).strip() == "":
+                    if found:
+                        break
+                    continue
+                start = values[columns["Start"]] if columns["Start"] < len(values) else None
+                if not isinstance(start, (int, float)):
+                    continue
+                label = str(name).strip()
+                seen[label] = seen.get(label, 0) + 1
+                unique = f"{label} ({seen[label]})" if seen[label] > 1 else label
+                task = TaskRow(sheet, row, unique, label, values, columns)
+                task.category = task.category or title
+                tasks.append(task)
+                found += 1
+        return tasks
+
+    def rows(self):
+        return [(t.name, t.category, t.start, t.duration, t.cause, t.delay) for t in self.tasks]
+
+    # Set a number in a task's column; True when the cell changed
+    def _set(self, task, key, value):
+        col = task.columns.get(key)
+        if col is None:
+            return False
+        cell = task.row.cell(col)
+        current = cell.value(task.sheet.strings)
+        if isinstance(current, (int, float)) and not isinstance(current, bool) and abs(current - value) < 1e-9:
+            return False
+        if key == "Delay" and cell.formula:
+            return False
+        cell.set_number(value)
+        return True
+
+    # Timeline cell holding a task's name: the bar's first cell. Labels cut
+    # short in the sheet ("Time Window to set up", "Reporting") still match.
+    def _bar_label(self, task, timeline):
+        for c in timeline:
+            cell = task.row.cells.get(c)
+            value = cell.value(task.sheet.strings) if cell is not None else None
+            if isinstance(value, str) and value.strip() and (
+                    value.strip().startswith(task.label) or task.label.startswith(value.strip())):
+                return c
+        return None
+
+    # Shift a task's bar by timeline cells, its first cell by `shift`
+    # and its last by `stretch` more than that. The bar is the merged range
+    # holding the label cell or, unmerged, the label cell and the run of
+    # same-styled cells after it; cells it leaves take the row's usual
+    # timeline style. A merged bar (or, on a sheet of merged bars, a
+    # one-cell bar that grows) is merged again at its new place. Returns the
+    # cells rewritten and whether the bar was cut at a timeline edge, or None
+    # without a bar.
+    def _move_bar(self, task, timeline, shift, stretch):
+        sheet, row = task.sheet, task.row
+        label = self._bar_label(task, timeline)
+        if label is None:
+            return None
+        style = row.cells[label].attrs.get("s")
+        first = last = timeline.index(label)
+        merge = sheet.merge_at(row.number, label)
+        if merge is not None:
+            while last + 1 < len(timeline) and timeline[last + 1] <= merge[2]:
+                last += 1
+        else:
+            while last + 1 < len(timeline) and timeline[last + 1] in row.cells \
+                    and row.cells[timeline[last + 1]].attrs.get("s") == style:
+                last += 1
+        old = timeline[first:last + 1]
+        first, last = first + shift, last + shift + stretch
+        clipped = first < 0 or last >= len(timeline)
+        first = max(0, min(first, len(timeline) - 1))
+        last = max(first, min(last, len(timeline) - 1))
+        new = timeline[first:last + 1]
+        if new == old:
+            return 0, clipped
+        merged = merge is not None or (len(old) == 1 and bool(sheet.merges))
+        if merge is not None:
+            sheet.merges.remove(merge)
+            sheet.merges_changed = True
+        if merged and len(new) > 1:
+            sheet.merges.append([new[0], row.number, new[-1], row.number])
+            sheet.merges_changed = True
+        background = Counter(cell.attrs.get("s") for c, cell in row.cells.items()
+                             if c in timeline and c not in old).most_common(1)
+        background = background[0][0] if background else None
+        label_cell = row.cells[label]
+        for c in old:
+            if background is None:
+                del row.cells[c]
+            else:
+                row.cells[c] = Cell(c, {"r": f"{col_name(c)}{row.number}", "s": background}, "")
+        for c in new:
+            row.cells[c] = Cell(c, {"r": f"{col_name(c)}{row.number}", "s": style}, "")
+        lead = row.cells[new[0]]
+        lead.attrs.update({k: v for k, v in label_cell.attrs.items() if k != "r"})
+        lead.inner = label_cell.inner
+        return len(set(old) | set(new)), clipped
+
+    # Apply {task: delay days} on top of the workbook's current delays and
+    # patch the tasks whose delay or dates change against the schedule the
+    # workbook holds now; rows of other tasks are left exactly as they are.
+    # Bars move by the change in timeline cells, so sheets whose bars were
+    # drawn by hand keep their own layout. Returns a summary of the edit.
+    @timed("export.update")
+    def update(self, delays):
+        unknown = sorted(set(delays) - {t.name for t in self.tasks})
+        if unknown:
+            raise KeyError(f"Unknown tasks: {', '.join(unknown)}")
+        rows = self.rows()
+        schedule = Schedule.from_rows(rows)
+        current = {row[0]: row[5] for row in rows if row[5]}
+        schedule.apply_delays(current)
+        before = schedule.start.copy(), schedule.end.copy(), schedule.delay.copy()
+        current.update(delays)
+        schedule.apply_delays({name: days for name, days in current.items() if days})
+        after = schedule.start, schedule.end, schedule.delay
+
+        timelines = {id(sheet): sheet.timeline() for _, sheet in self.sheets}
+        first_cell = lambda day, step: math.floor(day / step + 1e-9)
+        end_cell = lambda day, step: math.ceil(day / step - 1e-9)
+        cells = moved = 0
+        skipped, clipped = [], []
+        for task in self.tasks:
+            i = schedule.index[task.name]
+            (start0, end0, delay0), (start, end, delay) = ([float(c[i]) for c in v] for v in (before, after))
+            if max(abs(start - start0), abs(end - end0), abs(delay - delay0)) < 1e-9:
+                continue
+            dates = (("Start", start), ("End", end)) if task.resolved else (("Adj Start", start),)
+            written = sum(self._set(task, key, value) for key, value in (("Delay", delay),) + dates)
+            timeline, step = timelines[id(task.sheet)]
+            shift = first_cell(start, step) - first_cell(start0, step)
+            stretch = end_cell(end, step) - end_cell(end0, step) - shift
+            # No timeline or no bar found: reported, never skipped silently
+            bar = self._move_bar(task, timeline, shift, stretch) if timeline else None
+            if bar is None:
+                skipped.append(task.name)
+            else:
+                if bar[0]:
+                    written += bar[0]
+                    moved += 1
+                if bar[1]:
+                    clipped.append(task.name)
+            cells += written
+            task.row.changed |= bool(written)
+        count("cells_written", cells)
+        return {
+            "rows": sum(row.changed for _, sheet in self.sheets for row in sheet.rows),
+            "cells": cells,
+            "bars_moved": moved,
+            "bars_skipped": skipped,
+            "bars_clipped": clipped,
+            "makespan": schedule.makespan,
+        }
+
+    # Write the patched sheets back; other zip members are copied unchanged
+    def save(self, out=None):
+        out = out or self.path
+        replacements = {}
+        formulas = False
+        for _, sheet in self.sheets:
+            xml = sheet.patched()
+            if xml is not None:
+                replacements[sheet.path] = xml.encode("utf-8")
+                formulas = formulas or "<f" in xml
+        if not replacements:
+            if out != self.path:
+                with open(self.path, "rb") as src, open(out, "wb") as dst:
+                    dst.write(src.read())
+            return False
+        if formulas:
+            # Formulas fed by the new values are recalculated when Excel opens it
+            replacements["xl/workbook.xml"] = re.sub(
+                r"<calcPr\b(?![^>]*fullCalcOnLoad)", '<calcPr fullCalcOnLoad="1"', self.workbook_xml, count=1
+            ).encode("utf-8")
+        temp = f"{out}.{os.getpid()}.tmp"
+        with zipfile.ZipFile(self.path) as src, zipfile.ZipFile(temp, "w") as dst:
+            for info in src.infolist():
+                data = replacements.get(info.filename)
+                dst.writestr(info, data if data is not None else src.read(info.filename))
+        os.replace(temp, out)
+        return True
+
+
+def update_workbook(path, delays, out=None, dry_run=False):
+    workbook = PlanningWorkbook(path)
+    summary = workbook.update(delays)
+    summary["written"] = False if dry_run else workbook.save(out)
+    return summary
+
+
+# Update arguments, shared with `gantt_cli.py update`
+def add_arguments(parser):
+    parser.add_argument("workbook", help=".xlsx or .xlsm with a Task/Start table and a Day/Week/date timeline")
+    parser.add_argument("delays", help='new delays, e.g. "Vendor Verification=2; Check Seed Cost=1"')
+    parser.add_argument("--out", help="write here instead of over the workbook")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing")
+
+
+def run(args):
+    from batch_gantt import parse_task_values
+
+    try:
+        result = update_workbook(args.workbook, parse_task_values(args.delays), args.out, args.dry_run)
+    except KeyError as e:
+        sys.exit(e.args[0])
+    print(f"{result['cells']} cells in {result['rows']} rows changed, {result['bars_moved']} bars moved, "
+          f"finish day {result['makespan']:g}" + ("" if result["written"] else " (nothing written)"))
+    if result["bars_skipped"]:
+        print(f"Bars not moved (no timeline or bar found): {', '.join(result['bars_skipped'])}")
+    if result["bars_clipped"]:
+        print(f"Bars cut off at the edge of the timeline: {', '.join(result['bars_clipped'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply delay edits to a planning workbook in place, keeping macros")
+    add_arguments(parser)
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.configure(args)
+    run(args)
@@ -0,0 +1,101 @@
+# Workflow templates shared by the GUIs, the batch tools and the CLI. Plain
+# data only, so a headless export can load a template without Tk or matplotlib.
+
+# --- Seed procurement (gantt_2) ---
+# Optimized task breakdown with reduced durations
+task_buckets = {
+    "Planning": [
+        ("Understand Crop Requirement", 0, 1),
+        ("Determine Sowing Window", 0, 1),
+        ("Identify Suitable Varieties", 0, 1),
+        ("Evaluate Crop Variety Suitability", "Identify Suitable Varieties", 1)
+    ],
+    "Vendor": [
+        ("Search for Certified Vendors", "Evaluate Crop Variety Suitability", 1),
+        ("Vendor Verification", "Search for Certified Vendors", 0.5),
+        ("Vendor Approval", "Vendor Verification", 0.5)
+    ],
+    "Costing": [
+        ("Check Seed Cost", "Vendor Approval", 0.5),
+        ("Assess Availability", "Vendor Approval", 0.5),
+        ("Finalize Procurement Decision", ["Check Seed Cost", "Assess Availability"], 0.5)
+    ],
+    "Procurement": [
+        ("Seed Procurement", "Finalize Procurement Decision", 1),
+        ("Seed Conditioning", "Seed Procurement", 0.5),
+        ("Storage Planning", "Seed Conditioning", 0.5)
+    ]
+}
+
+# Color coding for each category
+category_colors = {
+    "Planning": "skyblue",
+    "Vendor": "lightgreen",
+    "Costing": "violet",
+    "Procurement": "orange"
+}
+
+# Delays applied for each simulated decision
+decision_delays = {
+    "Vendor Delay": {"Vendor Verification": 2},
+    "Rain Delay": {"Seed Procurement": 2},
+    "Cost Issue": {"Check Seed Cost": 1},
+}
+
+# --- Seed, compost and soil testing (gantt_3) ---
+# Combined task buckets from all systems
+combined_task_buckets = {
+    "Seed Planning": [
+        ("Seed Procurement", 0, 2),
+        ("Certified Vendor", "Seed Procurement", 2),
+        ("Crop Variety Suitability", "Certified Vendor", 3),
+        ("Cost & Availability", "Crop Variety Suitability", 2),
+        ("Vendor Approval", "Certified Vendor", 1),
+        ("Logistics Planning", "Seed Procurement", 2)
+    ],
+    "Compost Planning": [
+        ("Crop & Soil Analysis", 0, 5),
+        ("Compost Requirement", "Crop & Soil Analysis", 2),
+        ("Decision Tree Finalization", "Compost Requirement", 3),
+        ("Gobar Procurement", "Decision Tree Finalization", 4),
+        ("Green Manure Collection", "Decision Tree Finalization", 4),
+        ("Pit Readiness", "Decision Tree Finalization", 3),
+        ("Compost Mixing", "Gobar Procurement", 2),
+        ("Pit Monitoring", "Compost Mixing", 36),
+        ("Tractor Preparation", "Pit Monitoring", 1),
+        ("Rotavator Check", "Tractor Preparation", 1),
+        ("Field Prep & Compost Application", "Rotavator Check", 4),
+        ("Sowing Preparation", "Field Prep & Compost Application", 3)
+    ],
+    "Soil Testing": [
+        ("Soil Testing", 0, 2),
+        ("PH-Level", "Soil Testing", 2),
+        ("NPK Balance", "Soil Testing", 2),
+        ("Organic Carbon", "Soil Testing", 2)
+    ]
+}
+
+combined_category_colors = {
+    "Seed Planning": "cornflowerblue",
+    "Compost Planning": "lightgreen",
+    "Soil Testing": "lightpink"
+}
+
+# Delays applied for each tab's delay triggers
+scenario_delays = {
+    "Seed Planning": {
+        "Vendor Delay": {"Certified Vendor": 2},
+        "Cost Issue": {"Cost & Availability": 1},
+        "Rain Delay": {"Logistics Planning": 3},
+    },
+    "Compost Planning": {
+        "Compost Immature": {"Field Prep & Compost Application": 7, "Sowing Preparation": 7},
+        "Power Failure": {"Decision Tree Finalization": 2},
+        "Gobar Vendor Delay": {"Gobar Procurement": 3},
+        "Labour Shortage": {"Compost Mixing": 2, "Pit Readiness": 2},
+    },
+    "Soil Testing": {
+        "Lab Delay": {"PH-Level": 2, "NPK Balance": 2, "Organic Carbon": 2},
+        "Sensor Malfunction": {"Soil Testing": 3},
+    },
+}